@@ -2,25 +2,33 @@
 """
 Centralised YAML → dataclass loader for MusicBot.
 
-•  Читает все обязательные ключи и сохраняет «неизвестные» поля,
-   чтобы при расширении config.yaml код бота не падал.
+•  Читает все обязательные ключи и сохраняет «неизвестные» поля
+   в Config.extras, чтобы при расширении config.yaml код бота не падал.
 •  Поддерживает новые секции:
       - cookies
       - file_upload
       - metadata_lookup
    (Если в YAML эти разделы отсутствуют, будут установлены пустые dict.)
-•  Путь download_dir сразу приводится к pathlib.Path.
+•  Путь download_dir сразу приводится к абсолютному pathlib.Path
+   (~ раскрывается) и каталог создаётся при загрузке конфига.
 """
 
+import dataclasses
+import functools
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 
 import yaml
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class Config:
     """
-    Lightweight container for bot settings.
+    Lightweight, immutable container for bot settings.
+
+    Instances are shared between callers of Config.load (see _load_cached),
+    hence frozen.
     """
 
     # ----------------------------- #
@@ -33,43 +41,25 @@ class Config:
     # ----------------------------- #
     # Optional structured sections
     # ----------------------------- #
-    spotify: Dict[str, Any]
-    yandex: Dict[str, Any]
-    cookies: Dict[str, Any]
-    file_upload: Dict[str, Any]
-    metadata_lookup: Dict[str, Any]
+    spotify: Dict[str, Any] = field(default_factory=dict)
+    yandex: Dict[str, Any] = field(default_factory=dict)
+    cookies: Dict[str, Any] = field(default_factory=dict)
+    file_upload: Dict[str, Any] = field(default_factory=dict)
+    metadata_lookup: Dict[str, Any] = field(default_factory=dict)
 
-    # ----------------------------- #
-    # Constructor
-    # ----------------------------- #
-    def __init__(
-        self,
-        telegram_token: str,
-        allowed_users: List[int],
-        download_dir: str | Path,
-        *,
-        spotify: Optional[Dict[str, Any]] = None,
-        yandex: Optional[Dict[str, Any]] = None,
-        cookies: Optional[Dict[str, Any]] = None,
-        file_upload: Optional[Dict[str, Any]] = None,
-        metadata_lookup: Optional[Dict[str, Any]] = None,
-        **unknown: Any,  # future-proofing: capture unexpected keys
-    ) -> None:
-        # required
-        self.telegram_token = telegram_token
-        self.allowed_users = allowed_users
-        self.download_dir = Path(download_dir)
-
-        # optional sections
-        self.spotify = spotify or {}
-        self.yandex = yandex or {}
-        self.cookies = cookies or {}
-        self.file_upload = file_upload or {}
-        self.metadata_lookup = metadata_lookup or {}
-
-        # preserve unknown keys (won’t be used directly but keep for debugging)
-        for k, v in unknown.items():
-            setattr(self, k, v)
+    # unknown top-level keys (won’t be used directly but keep for debugging)
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # frozen dataclass → normalise through object.__setattr__
+        # Resolve and create the root once here, so downloaders don't have to.
+        download_dir = Path(self.download_dir).expanduser().resolve()
+        download_dir.mkdir(parents=True, exist_ok=True)
+        object.__setattr__(self, "download_dir", download_dir)
+        # YAML `section:` with no body yields None
+        for name in ("spotify", "yandex", "cookies", "file_upload", "metadata_lookup"):
+            if getattr(self, name) is None:
+                object.__setattr__(self, name, {})
 
     # ----------------------------- #
     # YAML loader
@@ -79,15 +69,32 @@ class Config:
         """
         Parse YAML into Config instance.
 
-        Any top-level keys not explicitly listed in __init__ will still be
-        attached to the resulting object (forward compatibility).
+        Any top-level keys not declared as fields end up in `extras`
+        (forward compatibility).
+
+        Parsed results are cached per (path, mtime, size), so repeated loads
+        of an unchanged file return the same shared instance.
         """
         path = Path(path)
+        st = path.stat()
+        return _load_cached(str(path), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _parse(path: str | Path) -> "Config":
+        path = Path(path)
+        # libyaml-backed loader when available (PyYAML wheels ship it)
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
         with path.open("r", encoding="utf-8") as fh:
-            data = yaml.safe_load(fh) or {}
+            data = yaml.load(fh, Loader=loader) or {}
+
+        known = {f.name for f in dataclasses.fields(Config)} - {"extras"}
+        kwargs = {k: v for k, v in data.items() if k in known}
+        extras = {k: v for k, v in data.items() if k not in known}
+        return Config(**kwargs, extras=extras)
 
-        # Expand `download_dir` tilde/user variables if present
-        if "download_dir" in data:
-            data["download_dir"] = str(Path(data["download_dir"]).expanduser())
 
-        return Config(**data)  # type: ignore[arg-type]
+@functools.lru_cache(maxsize=8)
+def _load_cached(path: str, mtime_ns: int, size: int) -> Config:
+    # mtime_ns/size only take part in the cache key: editing the file
+    # changes them and forces a fresh parse.
+    return Config._parse(path)
@@ -1,7 +1,9 @@
 # detector.py
 
 import re
+from functools import lru_cache
 from typing import Optional, Tuple
+from urllib.parse import urlsplit
 
 class URLDetector:
     """
@@ -19,21 +21,67 @@ class URLDetector:
     YA_ALBUM    = re.compile(r'music\.yandex\.ru/album/\d+')
     YA_PLAYLIST = re.compile(r'music\.yandex\.ru/users/[^/]+/playlists/\d+')
 
-    def detect(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+    # Group name -> (platform, link_type). Order is priority: at the same
+    # start position the regex alternation tries groups left to right.
+    # Yandex is not wired up yet, so its patterns are left out.
+    _PATTERNS = {
+        "yt_track":    (YT_TRACK,    ("youtube", "track")),
+        "yt_playlist": (YT_PLAYLIST, ("youtube", "playlist")),
+        "sp_track":    (SP_TRACK,    ("spotify", "track")),
+        "sp_album":    (SP_ALBUM,    ("spotify", "album")),
+        "sp_playlist": (SP_PLAYLIST, ("spotify", "playlist")),
+    }
+    _RX  = re.compile("|".join(f"(?P<{n}>{rx.pattern})" for n, (rx, _) in _PATTERNS.items()))
+    _MAP = {n: result for n, (_, result) in _PATTERNS.items()}
+
+    # Fast path: (host, first path segment) -> (platform, link_type, required query prefix).
+    # Whatever this table can't decide falls through to _RX.
+    _HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com")
+    _DISPATCH = {
+        **{(h, "watch"):    ("youtube", "track",    "v=")    for h in _HOSTS},
+        **{(h, "playlist"): ("youtube", "playlist", "list=") for h in _HOSTS},
+        ("open.spotify.com", "track"):    ("spotify", "track",    None),
+        ("open.spotify.com", "album"):    ("spotify", "album",    None),
+        ("open.spotify.com", "playlist"): ("spotify", "playlist", None),
+    }
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def detect(url: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Returns (platform, link_type) or (None, None) if no match.
         link_type is one of: "track", "album", "playlist".
+
+        Pure function of the URL, so results are memoized (retries and
+        re-sent links skip parsing entirely).
         """
-        if self.YT_TRACK.search(url):
-            return "youtube", "track"
-        if self.YT_PLAYLIST.search(url):
-            return "youtube", "playlist"
-
-        if self.SP_TRACK.search(url):
-            return "spotify", "track"
-        if self.SP_ALBUM.search(url):
-            return "spotify", "album"
-        if self.SP_PLAYLIST.search(url):
-            return "spotify", "playlist"
-
-        return None, None
+        hit = URLDetector._fast_detect(url)
+        if hit:
+            return hit
+        m = URLDetector._RX.search(url)
+        return URLDetector._MAP[m.lastgroup] if m else (None, None)
+
+    @staticmethod
+    def _fast_detect(url: str) -> Optional[Tuple[str, str]]:
+        """
+        Hash lookup on host + first path segment; None when undecided.
+        """
+        try:
+            u = urlsplit(url.strip())
+        except ValueError:
+            return None
+        host = u.netloc.lower()
+        parts = u.path.strip("/").split("/", 2)
+        if host == "youtu.be":
+            return ("youtube", "track") if parts[0] else None
+
+        entry = URLDetector._DISPATCH.get((host, parts[0]))
+        if not entry:
+            return None
+        platform, link_type, query_prefix = entry
+        if query_prefix:
+            # id must directly follow, e.g. watch?v=<id>
+            if u.query.startswith(query_prefix) and len(u.query) > len(query_prefix):
+                return platform, link_type
+            return None
+        return (platform, link_type) if len(parts) > 1 and parts[1] else None
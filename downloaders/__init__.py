@@ -7,7 +7,29 @@ from various platforms (YouTube, Spotify).
 Classes:
     - YouTubeDownloader
     - SpotifyDownloader
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+e.g. using only YouTubeDownloader never pulls in spotipy/requests.
 """
 
-from .youtube import YouTubeDownloader
-from .spotify import SpotifyDownloader
+import importlib
+
+_LAZY = {
+    "YouTubeDownloader": ".youtube",
+    "SpotifyDownloader": ".spotify",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # cache: next access skips __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -3,6 +3,8 @@
 import asyncio
 import logging
 import mimetypes
+import os
+import re
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -12,15 +14,32 @@ SuccessItem = Tuple[Dict[str, Any], Path]
 WarnItem    = Tuple[str, str]
 FailItem    = Tuple[str, str]
 
+_BAD_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+# MIME types Telegram actually sends for audio uploads; O(1) lookup before
+# falling back to mimetypes' table scan.
+_MIME_EXT = {
+    "audio/mpeg":   ".mp3",
+    "audio/mp3":    ".mp3",
+    "audio/mp4":    ".m4a",
+    "audio/x-m4a":  ".m4a",
+    "audio/aac":    ".aac",
+    "audio/ogg":    ".ogg",
+    "audio/opus":   ".opus",
+    "audio/flac":   ".flac",
+    "audio/x-flac": ".flac",
+    "audio/wav":    ".wav",
+    "audio/x-wav":  ".wav",
+    "audio/aiff":   ".aiff",
+    "audio/x-aiff": ".aiff",
+}
+
 
 def sanitize_filename(name: str) -> str:
     """
     Very small sanitizer: strip path separators and control chars.
     """
-    bad = ['\\', '/', ':', '*', '?', '"', '<', '>', '|']
-    for ch in bad:
-        name = name.replace(ch, "_")
-    return name.strip() or "untitled"
+    return _BAD_CHARS.sub("_", name).strip() or "untitled"
 
 
 class FileDownloader:
@@ -33,6 +52,8 @@ class FileDownloader:
     - Uses aiogram's Bot.download() convenience method to fetch the file. :contentReference[oaicite:7]{index=7}
     """
 
+    WRITE_BUFFER = 1 << 20  # bytes
+
     def __init__(
         self,
         download_root: Path,
@@ -43,11 +64,10 @@ class FileDownloader:
         self.download_root = download_root
         self.subdir = subdir
         self.allowed_exts = {e.lower() for e in (allowed_exts or [])}
+        self.dest_dir = download_root / subdir if subdir else download_root
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
         self.log = logging.getLogger("FileDownloader")
 
-        # Per-download state
-        self.warnings: List[WarnItem] = []
-
     # ------------------------------------------------------------------ #
     async def download_message(
         self,
@@ -57,9 +77,12 @@ class FileDownloader:
         """
         Inspect the message, pick the downloadable payload, save to disk.
         Returns (successes, failures, warnings).
+
+        Keeps no per-download state on the instance, so one downloader can
+        serve concurrent messages.
         """
 
-        self.warnings = []
+        warnings: List[WarnItem] = []
         successes: List[SuccessItem] = []
         failures: List[FailItem] = []
 
@@ -86,41 +109,42 @@ class FileDownloader:
             mime_type = d.mime_type
         else:
             failures.append(("message", "No downloadable audio/document payload found"))
-            return successes, failures, self.warnings
+            return successes, failures, warnings
 
         # Infer extension
-        ext = ""
-        if filename and "." in filename:
-            ext = "." + filename.rsplit(".", 1)[1]
-        elif mime_type:
-            ext = mimetypes.guess_extension(mime_type) or ""
-        ext = ext.lower()
+        ext = os.path.splitext(filename)[1].lower() if filename else ""
+        if not ext and mime_type:
+            ext = _MIME_EXT.get(mime_type) or mimetypes.guess_extension(mime_type) or ""
 
         # Trim querystrings, Telegram sometimes sends odd names
+        # (splitext keeps them: "a.mp3?x" -> ".mp3?x")
         if "?" in ext:
-            ext = ext.split("?", 1)[0]
+            ext = ext.partition("?")[0]
 
         # Validate against whitelist if provided
         if self.allowed_exts and ext and ext not in self.allowed_exts:
             # Hard reject -> failure
             failures.append((filename or "file", f"Extension {ext} not allowed"))
-            return successes, failures, self.warnings
+            return successes, failures, warnings
 
         # Build destination path
-        dest_dir = self.download_root / self.subdir
-        dest_dir.mkdir(parents=True, exist_ok=True)
-
         safe_name = sanitize_filename(filename or downloadable.file_unique_id + (ext or ""))
         if not safe_name.lower().endswith(ext) and ext:
             safe_name += ext
-        dest_path = dest_dir / safe_name
+        dest_path = self.dest_dir / safe_name
 
-        # Download
+        # Download into our own 1 MiB-buffered handle: fewer write() syscalls on big files
         try:
-            await bot.download(downloadable, destination=dest_path)  # aiogram convenience. :contentReference[oaicite:8]{index=8}
+            with open(dest_path, "wb", buffering=self.WRITE_BUFFER) as fh:
+                await bot.download(downloadable, destination=fh, seek=False)  # aiogram convenience. :contentReference[oaicite:8]{index=8}
         except Exception as e:
+            # don't leave a truncated file behind
+            try:
+                os.unlink(dest_path)
+            except OSError:
+                pass
             failures.append((safe_name, f"Download failed: {e}"))
-            return successes, failures, self.warnings
+            return successes, failures, warnings
 
         # Basic metadata
         meta: Dict[str, Any] = {
@@ -138,4 +162,4 @@ class FileDownloader:
         }
 
         successes.append((meta, dest_path))
-        return successes, failures, self.warnings
+        return successes, failures, warnings
@@ -1,28 +1,257 @@
 # downloaders/spotify.py
 
+import os
 import re
 import time
+import shutil
 import asyncio
-import subprocess
-from functools import partial
+import contextlib
+import hashlib
+import tempfile
+import threading
+import functools
+import http.cookiejar
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Optional, Deque, Mapping
 
 import mimetypes
+import aiohttp
 import requests
 import spotipy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials
 
+from utils import LRUCache
+
+
+_SANITIZE_RE     = re.compile(r'[\\/:"*?<>|]+')
+_ALBUM_URL_RE    = re.compile(r"album/([0-9A-Za-z]+)")
+_PLAYLIST_URL_RE = re.compile(r"playlist/([0-9A-Za-z]+)")
+_TRACK_URL_RE    = re.compile(r"track/([0-9A-Za-z]+)")
+
 
 def sanitize_filename(name: str) -> str:
     """Replace filesystem-unsafe characters with underscores."""
-    return re.sub(r'[\\/:"*?<>|]+', "_", name)
+    return _SANITIZE_RE.sub("_", name)
+
+
+# Cover art MIME → extension; mimetypes is only the fallback.
+_IMAGE_EXT = {
+    "image/jpeg": ".jpg",
+    "image/jpg":  ".jpg",
+    "image/png":  ".png",
+    "image/webp": ".webp",
+}
+
+
+# Spotify Web API `fields=` selectors: only what _track_meta_from_spotify_obj
+# and the folder naming actually read.
+_TRACK_FIELDS = (
+    "name,artists(name),album(name,artists(name),release_date,images(url)),"
+    "track_number,disc_number,duration_ms,external_ids,external_urls,popularity"
+)
+_PLAYLIST_ITEMS_FIELDS = f"total,limit,next,items(track({_TRACK_FIELDS}))"
+_PLAYLIST_FIELDS = f"name,images(url),owner(display_name),tracks({_PLAYLIST_ITEMS_FIELDS})"
+
+
+# One aiohttp session for cover downloads, created lazily inside the bot's
+# event loop and reused across downloads (keep-alive to Spotify's CDN).
+_aio_session: Optional[aiohttp.ClientSession] = None
+
+
+def _cover_session() -> aiohttp.ClientSession:
+    global _aio_session
+    if _aio_session is None or _aio_session.closed:
+        _aio_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    return _aio_session
+
+
+async def close_cover_session() -> None:
+    """Close the shared cover session (bot shutdown); reopened on next use."""
+    if _aio_session is not None and not _aio_session.closed:
+        await _aio_session.close()
+
+
+# Stand-in for "no semaphore" in `async with sem or _NO_LIMIT`
+_NO_LIMIT = contextlib.nullcontext()
+
+# Albums and tracks are immutable by ID (the TTL only refreshes fields like
+# popularity); playlists change, so theirs is kept short. Module level:
+# shared by every user's downloader.
+_ALBUM_CACHE    = LRUCache(512, ttl=3600)
+_PLAYLIST_CACHE = LRUCache(128, ttl=60)
+_TRACK_CACHE    = LRUCache(4096, ttl=3600)
+
+
+class _LeakyBucket:
+    """
+    Thread-safe leaky bucket: calls to acquire() drain at most `rate` per
+    second, process-wide. Spotipy is synchronous and runs in worker
+    threads (page fetches, asyncio.to_thread), hence threading, not asyncio.
+    """
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Shared by every SpotifyDownloader so concurrent users can't add up past it
+_SPOTIFY_BUCKET = _LeakyBucket(rate_per_sec=10)
+
+# Page fetches for all downloaders share one pool instead of spinning up
+# threads per album/playlist; the bucket above still bounds the request rate.
+_PAGE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spotify-page")
+
+
+def _staged_cookie_file(cookie_file: Path) -> Path:
+    """
+    Copy of cookies.txt on tmpfs (/dev/shm when available) that every
+    spotDL subprocess reads instead of the original file on disk.
+    """
+    st = cookie_file.stat()
+    return _stage_cookies(str(cookie_file), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _stage_cookies(path: str, mtime_ns: int, size: int) -> Path:
+    # mtime_ns/size only take part in the cache key (cf. config._load_cached):
+    # an edited cookie file is parsed and staged again.
+    jar = http.cookiejar.MozillaCookieJar()
+    try:
+        jar.load(path, ignore_discard=True, ignore_expires=True)
+    except (OSError, http.cookiejar.LoadError):
+        return Path(path)  # let spotDL/yt-dlp report it
+
+    shm = Path("/dev/shm")
+    stage_dir = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+    target = stage_dir / f"spotdl_cookies_{hashlib.sha1(path.encode()).hexdigest()[:12]}.txt"
+    fd, tmp = tempfile.mkstemp(dir=stage_dir, prefix=".spotdl_cookies_")
+    os.close(fd)
+    jar.save(tmp, ignore_discard=True, ignore_expires=True)
+    os.replace(tmp, target)  # atomic: a running spotDL never sees a half-written file
+    return target
+
+
+def _build_session() -> requests.Session:
+    """
+    requests.Session with a pool large enough for concurrent downloads and
+    their page-fetch threads, retry/backoff on 429/5xx (honours
+    Retry-After) and gzip enabled.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,  # Spotipy also retries POST/PUT
+        ),
+    )
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+# One keep-alive pool for all Spotify HTTP traffic (API + token endpoint)
+_HTTP = _build_session()
+
+
+@functools.lru_cache(maxsize=4)
+def _spotify_client(client_id: str, client_secret: str) -> spotipy.Spotify:
+    # main.py keeps a SpotifyDownloader per user; sharing the client also
+    # shares its access token instead of requesting one per user.
+    auth = SpotifyClientCredentials(
+        client_id=client_id,
+        client_secret=client_secret,
+        requests_session=_HTTP,
+    )
+    return spotipy.Spotify(auth_manager=auth, requests_session=_HTTP)
+
+
+# Shared read-only fallback for `(x or _EMPTY).get(...)`: no dict per miss
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _dig(obj: Any, *keys: str) -> Any:
+    """obj[k1][k2]..., or None as soon as a level is missing / not a dict."""
+    for key in keys:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _cover_url_of(track: Dict[str, Any]) -> Optional[str]:
+    """First album image of a Spotify track object, if any."""
+    images = _dig(track, "album", "images")
+    return images[0].get("url") if images else None
+
+
+def _make_scratch(parent: Path) -> Path:
+    """Private, hidden per-run directory for spotDL output under `parent`."""
+    return Path(tempfile.mkdtemp(prefix=".spdl_", dir=parent))
+
+
+def _m4a_names(directory: Path) -> set:
+    with os.scandir(directory) as it:
+        return {e.name for e in it if e.name.endswith(".m4a") and e.is_file()}
+
+
+def _move_into(src: Path, dest_dir: Path) -> Path:
+    """Move a finished file out of its scratch dir (same filesystem: a rename)."""
+    dest = dest_dir / src.name
+    os.replace(src, dest)
+    return dest
+
+
+def _join_names(artists: Optional[List[Dict[str, Any]]]) -> str:
+    """'A, B' from Spotify artist objects; no generator for the usual single artist."""
+    if not artists:
+        return ""
+    if len(artists) == 1:
+        return artists[0]["name"]
+    return ", ".join(a["name"] for a in artists)
+
+
+# spotDL's own filename sanitizing (formatter.sanitize_string)
+_SPOTDL_NAME_TABLE = str.maketrans({c: None for c in '/?\\*|<>'} | {'"': "'", ":": "-"})
+
+
+def _spotdl_filename(template: str, track: Dict[str, Any]) -> str:
+    """
+    File name spotDL's default templates give `track`, so a file already in
+    the library can be recognised before spotDL is run for it.
+    """
+    name = (
+        template.replace("{track-number}", f"{track.get('track_number') or 0:02d}")
+        .replace("{artists}", _join_names(track.get("artists")))
+        .replace("{title}", track.get("name") or "")
+        .replace("{output-ext}", "m4a")
+    )
+    return name.translate(_SPOTDL_NAME_TABLE)
 
 
 # Type aliases
 SuccessItem = Tuple[Dict[str, Any], Path]
 FailItem    = Tuple[str, str]
 WarnItem    = Tuple[str, str]
+Warnings    = Deque[WarnItem]  # per-download sink, appended from tasks and threads
 
 
 class SpotifyDownloader:
@@ -39,6 +268,16 @@ class SpotifyDownloader:
 
     MAX_RETRIES   = 3
     INITIAL_DELAY = 5  # seconds
+    TRACK_WORKERS = min(4, os.cpu_count() or 2)  # spotDL --threads per run
+    BATCH_SIZE    = 25  # track URLs per spotDL run
+    RUN_WORKERS   = 2   # concurrent spotDL runs per album/playlist
+    COVER_WORKERS = 8   # concurrent cover art fetches per album/playlist
+    COVER_MAX_BYTES = 8 * 1024 * 1024  # same cap as TagLookup's cover fetches
+    TRACKS_PER_CALL = 50  # Spotify /v1/tracks?ids= limit
+
+    # Default spotDL file names (see _match_files for the collection one)
+    TRACK_TEMPLATE      = "{artists} - {title}.{output-ext}"
+    COLLECTION_TEMPLATE = "{track-number} - {artists} - {title}.{output-ext}"
 
     def __init__(
         self,
@@ -59,113 +298,248 @@ class SpotifyDownloader:
         self.output_template = output_template
         self.cookie_file     = Path(cookie_file) if cookie_file else None
 
-        # Spotipy client for metadata
-        auth = SpotifyClientCredentials(
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-        )
-        self.sp = spotipy.Spotify(auth_manager=auth)
+        # Keep-alive HTTP pool and Spotipy client, shared process-wide
+        self.http = _HTTP
+        self.sp = _spotify_client(self.client_id, self.client_secret)
 
-        # Per-download warnings
-        self.warnings: List[WarnItem] = []
 
     # ------------------------------------------------------------------ #
     # Internal helpers
     # ------------------------------------------------------------------ #
-    def _run_spotdl(self, cmd: List[str], context: str):
+    def _sp_call(self, warnings: Warnings, fn, *args, **kwargs):
+        """
+        Call a Spotipy method through the shared rate limiter. A 429 that
+        survives the HTTP adapter's retries is retried here after the
+        server's Retry-After delay (noted in `warnings`).
+        """
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            _SPOTIFY_BUCKET.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self.MAX_RETRIES:
+                    raise
+                retry_after = (e.headers or {}).get("Retry-After")
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = self.INITIAL_DELAY
+                warnings.append(("spotify", f"rate limited, retrying in {delay:.0f}s"))
+                time.sleep(delay)
+
+    def _spotdl_cmd(self, urls: List[str], out_template: str) -> List[str]:
+        """
+        One spotDL run for all given track URLs; spotDL parallelises
+        internally (--threads), so startup cost is paid once per request.
+        """
+        cmd = [
+            "spotdl",
+            *urls,
+            "--threads",
+            str(self.TRACK_WORKERS),
+            "--output",
+            out_template,
+            "--format",
+            "m4a",
+            "--overwrite",
+            "skip",
+            "--print-errors",  # list failed songs at exit -> warnings
+        ]
+        if self.cookie_file:
+            cmd.extend(["--cookie-file", str(_staged_cookie_file(self.cookie_file))])
+        return cmd
+
+    async def _run_spotdl(self, cmd: List[str], context: str, warnings: Warnings):
         """
         Run spotDL CLI with retries on failure. Record warnings
         on each failed attempt before final failure.
         """
         delay = self.INITIAL_DELAY
         for attempt in range(1, self.MAX_RETRIES + 1):
+            # A separate short-lived process per run already isolates spotDL
+            # and yt-dlp; their descriptors die with it. Make sure it does die.
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
             try:
-                subprocess.run(
-                    cmd,
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
+                out, err = await proc.communicate()
+            except asyncio.CancelledError:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+            if proc.returncode == 0:
                 return
-            except subprocess.CalledProcessError as e:
-                err_txt = e.stderr.strip() if e.stderr else str(e)
-                self.warnings.append((context, f"spotDL failed on attempt {attempt}: {err_txt}"))
-                if attempt == self.MAX_RETRIES:
-                    raise RuntimeError(
-                        f"spotDL CLI failed after {self.MAX_RETRIES} attempts: {err_txt}"
-                    )
-                time.sleep(delay)
-                delay *= 2
+            # --print-errors output may land on either stream
+            err_txt = (err or out or b"").decode("utf-8", "replace").strip() or f"exit code {proc.returncode}"
+            warnings.append((context, f"spotDL failed on attempt {attempt}: {err_txt}"))
+            if attempt == self.MAX_RETRIES:
+                raise RuntimeError(
+                    f"spotDL CLI failed after {self.MAX_RETRIES} attempts: {err_txt}"
+                )
+            await asyncio.sleep(delay)
+            delay *= 2
 
     def _fetch_album_metadata(
         self,
         album_url: str,
+        warnings: Warnings,
     ) -> Tuple[str, str, List[Dict[str, Any]], str]:
         """
         Fetch full album info and return:
             album_name, cover_url, track_objs, primary_artist
         """
-        m = re.search(r"album/([0-9A-Za-z]+)", album_url)
+        m = _ALBUM_URL_RE.search(album_url)
         if not m:
             raise RuntimeError("Invalid Spotify album URL")
         album_id = m.group(1)
 
-        alb = self.sp.album(album_id)
+        def _fetch():
+            alb = self._sp_call(warnings, self.sp.album, album_id)
+            # Spotify album() returns up to 50 tracks; fetch the rest in parallel
+            tracks = self._collect_pages(
+                alb["tracks"],
+                lambda off, lim: self._sp_call(warnings, self.sp.album_tracks, album_id, limit=lim, offset=off),
+            )
+            # album_tracks() yields simplified objects (no album, ISRC,
+            # popularity): upgrade them with batched /v1/tracks lookups
+            full = self._fetch_tracks([t.get("id") for t in tracks], warnings)
+            return alb, [f or t for f, t in zip(full, tracks)]
+
+        alb, tracks = _ALBUM_CACHE.get_or_fetch(album_id, _fetch)
         album_name     = alb["name"]
         cover_url      = alb["images"][0]["url"] if alb["images"] else None
         primary_artist = alb["artists"][0]["name"] if alb.get("artists") else "Unknown Artist"
 
-        # Spotify album() returns up to 50 tracks; page if needed
-        tracks = list(alb["tracks"]["items"])
-        while alb["tracks"]["next"]:
-            alb["tracks"] = self.sp.next(alb["tracks"])
-            tracks.extend(alb["tracks"]["items"])
-
-        # Order by disc_number + track_number
-        tracks.sort(key=lambda t: (t.get("disc_number", 1), t.get("track_number", 0)))
+        # Order by disc_number + track_number. Spotify already returns album
+        # tracks in order, so only sort (into a new list: the cached one stays
+        # untouched) when that invariant doesn't hold.
+        keys = [(t.get("disc_number", 1), t.get("track_number", 0)) for t in tracks]
+        if any(a > b for a, b in zip(keys, keys[1:])):
+            tracks = [t for _, t in sorted(zip(keys, tracks), key=lambda kt: kt[0])]
         return album_name, cover_url, tracks, primary_artist
 
     def _fetch_playlist_metadata(
         self,
         playlist_url: str,
+        warnings: Warnings,
     ) -> Tuple[str, str, List[Dict[str, Any]], str]:
         """
         Fetch playlist info and return:
             playlist_name, cover_url, track_objs, primary_owner
         """
-        m = re.search(r"playlist/([0-9A-Za-z]+)", playlist_url)
+        m = _PLAYLIST_URL_RE.search(playlist_url)
         if not m:
             raise RuntimeError("Invalid Spotify playlist URL")
         playlist_id = m.group(1)
 
-        pl = self.sp.playlist(playlist_id)
+        return _PLAYLIST_CACHE.get_or_fetch(playlist_id, lambda: self._fetch_playlist(playlist_id, warnings))
+
+    def _fetch_playlist(self, playlist_id: str, warnings: Warnings) -> Tuple[str, str, List[Dict[str, Any]], str]:
+        pl = self._sp_call(warnings, self.sp.playlist, playlist_id, fields=_PLAYLIST_FIELDS)
         playlist_name = pl["name"]
         cover_url     = pl["images"][0]["url"] if pl["images"] else None
         primary_owner = pl["owner"]["display_name"] or "Playlist"
 
-        # Paginated items
-        tracks: List[Dict[str, Any]] = []
-        results = pl["tracks"]
-        while True:
-            for item in results["items"]:
-                tr = item.get("track")
-                if tr:
-                    tracks.append(tr)
-            if results["next"]:
-                results = self.sp.next(results)
-            else:
-                break
+        # Paginated items (first page embedded, remaining pages in parallel)
+        items = self._collect_pages(
+            pl["tracks"],
+            lambda off, lim: self._sp_call(
+                warnings,
+                self.sp.playlist_items,
+                playlist_id,
+                fields=_PLAYLIST_ITEMS_FIELDS,
+                limit=lim,
+                offset=off,
+                additional_types=("track",),
+            ),
+        )
+        tracks: List[Dict[str, Any]] = [it["track"] for it in items if it.get("track")]
 
         return playlist_name, cover_url, tracks, primary_owner
 
-    @staticmethod
-    def _maybe_download_cover(cover_url: Optional[str], out_dir: Path) -> None:
+    def _fetch_tracks(self, ids: List[Optional[str]], warnings: Warnings) -> List[Optional[Dict[str, Any]]]:
+        """
+        Full track objects for `ids`, in order (None where unknown).
+
+        Served from _TRACK_CACHE where possible; the rest is requested
+        TRACKS_PER_CALL IDs per call, so N tracks cost ceil(N/50) requests.
+        """
+        found = {i: _TRACK_CACHE.get(i) for i in ids if i}
+        missing = list(dict.fromkeys(i for i, v in found.items() if v is None))
+        chunks = [missing[n:n + self.TRACKS_PER_CALL] for n in range(0, len(missing), self.TRACKS_PER_CALL)]
+        for resp in _PAGE_POOL.map(lambda c: self._sp_call(warnings, self.sp.tracks, c), chunks):
+            for tr in resp.get("tracks") or []:
+                if tr and tr.get("id"):
+                    _TRACK_CACHE.put(tr["id"], tr)
+                    found[tr["id"]] = tr
+        return [found.get(i) if i else None for i in ids]
+
+    def _collect_pages(self, first_page: Dict[str, Any], fetch) -> List[Dict[str, Any]]:
+        """
+        Concatenate items of a Spotify paging object.
+
+        The first page is already at hand; the remaining offsets are known
+        from `total`/`limit`, so they are requested concurrently via
+        fetch(offset, limit) instead of following `next` one by one.
+        """
+        items = list(first_page["items"])
+        if not first_page.get("next"):
+            return items
+        limit = first_page.get("limit") or len(items) or 50
+        offsets = range(len(items), first_page["total"], limit)
+        for page in _PAGE_POOL.map(lambda off: fetch(off, limit), offsets):
+            items.extend(page["items"])
+        return items
+
+    async def _fetch_cover(
+        self,
+        cover_url: str,
+        context: str,
+        warnings: Warnings,
+        sem: Optional[asyncio.Semaphore] = None,
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Download cover art into memory: (bytes, MIME type), None on failure.
+        The bytes end up as meta['cover_bytes'] (embedded without another
+        fetch) and/or as the folder's cover.* file. Streamed, and dropped as
+        soon as it exceeds COVER_MAX_BYTES.
+        """
+        limit = self.COVER_MAX_BYTES
+        try:
+            async with sem or _NO_LIMIT:
+                async with _cover_session().get(cover_url) as resp:
+                    resp.raise_for_status()
+                    mime = resp.headers.get("Content-Type", "").split(";")[0].strip()
+                    if (resp.content_length or 0) > limit:
+                        raise ValueError(f"larger than {limit} bytes")
+                    buf = bytearray()
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        buf += chunk
+                        if len(buf) > limit:
+                            raise ValueError(f"larger than {limit} bytes")
+                    return bytes(buf), mime
+        except Exception as e:
+            # Записываем предупреждение, если не удалось скачать обложку
+            warnings.append((context, f"cover download failed: {e}"))
+            return None
+
+    async def _maybe_download_cover(
+        self,
+        cover_url: Optional[str],
+        cover: Optional["asyncio.Task"],
+        out_dir: Path,
+        warnings: Warnings,
+    ) -> None:
         """
-        Скачивает обложку альбома в out_dir как cover.*,
+        Сохраняет обложку альбома в out_dir как cover.*,
         если нет файлов cover.*, folder.* или front.*.
+        `cover` — задача _fetch_cover, уже запущенная для cover_url.
         """
-        if not cover_url:
+        if not cover_url or cover is None:
             return
 
         # Проверяем существующие файлы (CoverArtPriority)
@@ -173,133 +547,262 @@ class SpotifyDownloader:
             if any(out_dir.glob(pattern)):
                 return
 
+        got = await cover
+        if not got:
+            return
+        data, mime = got
+
+        # Выясняем расширение из Content-Type или URL
+        ext = (
+            _IMAGE_EXT.get(mime)
+            or mimetypes.guess_extension(mime)
+            or Path(cover_url).suffix
+            or ".jpg"
+        )
+        if ext.lower() in {".jpeg", ".jpe"}:
+            ext = ".jpg"
         try:
-            resp = requests.get(cover_url, timeout=10)
-            resp.raise_for_status()
-
-            # Выясняем расширение из Content-Type или URL
-            mime = resp.headers.get("Content-Type", "").split(";")[0].strip()
-            ext = mimetypes.guess_extension(mime) or Path(cover_url).suffix or ".jpg"
-            if ext.lower() in {".jpeg", ".jpe"}:
-                ext = ".jpg"
-
-            file_path = out_dir / f"cover{ext}"
-            with open(file_path, "wb") as fh:
-                fh.write(resp.content)
-        except Exception as e:
-            # Записываем предупреждение, если не удалось скачать обложку
-            # (обработка происходит через self.warnings)
-            # Здесь контекст — имя папки
-            warn_msg = f"cover download failed: {e}"
-            SpotifyDownloader._record_warning_static(out_dir.name, warn_msg)
-
-    @staticmethod
-    def _record_warning_static(context: str, message: str) -> None:
-        """
-        Вспомогательный метод для записи предупреждений из статического контекста.
-        Реальную реализацию можно перенести в _run_spotdl или другой центр.
-        """
-        # Реализуйте логику, например, ставьте в глобальный лог
-        pass
+            (out_dir / f"cover{ext}").write_bytes(data)
+        except OSError as e:
+            warnings.append((out_dir.name, f"cover save failed: {e}"))
 
     # ------------------------------------------------------------------ #
-    # Sync worker
+    # Download workers
     # ------------------------------------------------------------------ #
-    def _sync_download(self, url: str, link_type: str) -> List[SuccessItem]:
-        if link_type == "track":
-            return self._download_track(url)
-
-        if link_type == "album":
-            name, cover_url, tracks, primary = self._fetch_album_metadata(url)
-        else:
-            name, cover_url, tracks, primary = self._fetch_playlist_metadata(url)
+    async def _download_collection(
+        self,
+        url: str,
+        link_type: str,
+        warnings: Warnings,
+    ) -> Tuple[List[SuccessItem], List[FailItem]]:
+        """
+        Album/playlist: resolve the track list via Spotipy, then download the
+        tracks in multi-threaded spotDL runs of BATCH_SIZE URLs, at most
+        RUN_WORKERS of them at a time.
+        """
+        fetch = self._fetch_album_metadata if link_type == "album" else self._fetch_playlist_metadata
+        name, cover_url, tracks, primary = await asyncio.to_thread(fetch, url, warnings)
 
         dir_name = sanitize_filename(f"{primary} - {name}")
         out_dir = self.download_dir / dir_name
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        # Скачиваем обложку альбома/плейлиста
-        self._maybe_download_cover(cover_url, out_dir)
-
-        context = dir_name
-        out_template = (
-            self.output_template
-            or str(out_dir / "{track-number} - {artists} - {title}.{output-ext}")
-        )
-
-        cmd = [
-            "spotdl",
-            url,
-            "--output",
-            out_template,
-            "--format",
-            "m4a",
-            "--overwrite",
-            "skip",
-        ]
-        if self.cookie_file:
-            cmd.extend(["--cookie-file", str(self.cookie_file)])
-
-        self._run_spotdl(cmd, context)
+        covers: Dict[str, asyncio.Task] = {}
+        cover_task: Optional[asyncio.Task] = None
+        run_dir = out_dir
+        # Everything from here on runs under the finally below: however the
+        # call ends (error, cancellation), the cover tasks are reaped and the
+        # scratch dir is removed from the user's library.
+        try:
+            # Обложки (папки и всех треков, без дублей) качаются параллельно с
+            # загрузкой аудио; для альбома это обычно один и тот же URL.
+            cover_sem = asyncio.Semaphore(self.COVER_WORKERS)
+            cover_urls = {cover_url, *(_cover_url_of(t) for t in tracks)} - {None}
+            for u in cover_urls:
+                covers[u] = asyncio.create_task(self._fetch_cover(u, dir_name, warnings, cover_sem))
+            cover_task = asyncio.create_task(self._maybe_download_cover(cover_url, covers.get(cover_url), out_dir, warnings))
+
+            # With the default template spotDL writes into a private scratch dir
+            # that is then moved into out_dir: the scan only sees this run's files
+            # and concurrent requests for the same folder can't collide.
+            if not self.output_template:
+                run_dir = _make_scratch(out_dir)
+            out_template = self.output_template or str(run_dir / self.COLLECTION_TEMPLATE)
+
+            pending: List[Tuple[Dict[str, Any], str]] = []
+            failures: List[FailItem] = []
+            # Scratch runs can't see the library, so --overwrite skip has nothing
+            # to skip: tracks already in out_dir (under the name spotDL would give
+            # them) are taken as they are and left out of the runs.
+            existing: List[Tuple[Dict[str, Any], Path]] = []
+            have = set() if self.output_template else await asyncio.to_thread(_m4a_names, out_dir)
+            for track in tracks:
+                tr_url = _dig(track, "external_urls", "spotify")
+                if not tr_url:
+                    failures.append((track.get("name") or dir_name, "no Spotify URL (local file?)"))
+                    continue
+                name = _spotdl_filename(self.COLLECTION_TEMPLATE, track) if have else None
+                if name in have:
+                    existing.append((track, out_dir / name))
+                else:
+                    pending.append((track, tr_url))
+
+            # Large collections are split into batches run as concurrent spotDL
+            # processes; a batch that keeps failing only fails its own tracks.
+            batches = [pending[i:i + self.BATCH_SIZE] for i in range(0, len(pending), self.BATCH_SIZE)]
+            sem = asyncio.Semaphore(self.RUN_WORKERS)
+
+            async def _run_batch(n: int, batch: List[Tuple[Dict[str, Any], str]]) -> None:
+                context = dir_name if len(batches) == 1 else f"{dir_name} [{n}/{len(batches)}]"
+                async with sem:
+                    await self._run_spotdl(self._spotdl_cmd([u for _, u in batch], out_template), context, warnings)
+
+            outcomes = await asyncio.gather(
+                *(_run_batch(n, b) for n, b in enumerate(batches, 1)),
+                return_exceptions=True,
+            )
+            # never raise: failures become warnings
+            await asyncio.gather(cover_task, *covers.values())
+
+            done: List[Dict[str, Any]] = []
+            for batch, outcome in zip(batches, outcomes):
+                if isinstance(outcome, Exception):
+                    failures.extend((track.get("name") or dir_name, str(outcome)) for track, _ in batch)
+                else:
+                    done.extend(track for track, _ in batch)
+
+            matched = self._match_files(done, run_dir, by_number=not self.output_template)
+            if run_dir is not out_dir:
+                matched = [(data, _move_into(path, out_dir)) for data, path in matched]
+        finally:
+            # no-op for tasks that already finished (the normal path)
+            tasks = [t for t in (cover_task, *covers.values()) if t is not None]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if run_dir is not out_dir:
+                shutil.rmtree(run_dir, ignore_errors=True)
 
-        m4a_files = sorted(out_dir.glob("*.m4a"))
         results: List[SuccessItem] = []
-        for data, file_path in zip(tracks, m4a_files):
+        for data, file_path in existing + matched:
             meta = self._track_meta_from_spotify_obj(data)
+            got = covers[meta["cover_url"]].result() if meta["cover_url"] in covers else None
+            if got:
+                meta["cover_bytes"] = got[0]
             results.append((meta, file_path))
+        return results, failures
 
-        return results
+    @staticmethod
+    def _match_files(
+        tracks: List[Dict[str, Any]],
+        out_dir: Path,
+        by_number: bool,
+    ) -> List[Tuple[Dict[str, Any], Path]]:
+        """
+        Pair downloaded .m4a files in out_dir with their Spotify tracks.
 
-    def _download_track(self, url: str) -> List[SuccessItem]:
-        context = url
-        out_template = (
-            self.output_template
-            or str(self.download_dir / "{artists} - {title}.{output-ext}")
-        )
-        cmd = [
-            "spotdl",
-            url,
-            "--output",
-            out_template,
-            "--format",
-            "m4a",
-            "--overwrite",
-            "skip",
+        With the default "{track-number} - ..." template a file is matched
+        on its leading number when that number is unique on both sides, so
+        a track spotDL silently skipped doesn't shift every later pairing.
+        Whatever is left (custom templates, clashing numbers in playlists or
+        multi-disc albums) is paired in name order, as before.
+        """
+        with os.scandir(out_dir) as it:
+            files = sorted(e.name for e in it if e.name.endswith(".m4a") and e.is_file())
+
+        by_tn: Dict[int, str] = {}
+        if by_number:
+            file_tn: Dict[int, List[str]] = {}
+            for name in files:
+                head = name.split(" ", 1)[0]
+                if head.isdigit():
+                    file_tn.setdefault(int(head), []).append(name)
+            track_tn: Dict[Any, int] = {}
+            for t in tracks:
+                tn = t.get("track_number")
+                track_tn[tn] = track_tn.get(tn, 0) + 1
+            by_tn = {
+                tn: names[0]
+                for tn, names in file_tn.items()
+                if len(names) == 1 and track_tn.get(tn) == 1
+            }
+
+        pairs: List[Tuple[Dict[str, Any], Optional[str]]] = [
+            (t, by_tn.get(t.get("track_number"))) for t in tracks
         ]
-        if self.cookie_file:
-            cmd.extend(["--cookie-file", str(self.cookie_file)])
-
-        self._run_spotdl(cmd, context)
+        taken = {name for _, name in pairs if name}
+        rest = iter(name for name in files if name not in taken)
+        matched: List[Tuple[Dict[str, Any], Path]] = []
+        for t, name in pairs:
+            name = name or next(rest, None)
+            if name:
+                matched.append((t, out_dir / name))
+        return matched
+
+    async def _download_track(self, url: str, warnings: Warnings) -> List[SuccessItem]:
+        context = url
+        if not self.output_template:
+            # already in the library under spotDL's default name: no run at all
+            # (the Spotify lookup is cached, the metadata below reuses it)
+            path = await asyncio.to_thread(self._existing_track_file, url, warnings)
+            if path:
+                return [(await self._track_meta_with_cover(url, warnings), path)]
+        # Spotify metadata + cover lookup overlap the spotDL run instead of following it
+        meta_task = asyncio.create_task(self._track_meta_with_cover(url, warnings))
+        try:
+            if self.output_template:
+                await self._run_spotdl(self._spotdl_cmd([url], self.output_template), context, warnings)
+                path = await asyncio.to_thread(self._newest_m4a, self.download_dir)
+            else:
+                # private scratch dir: exactly this run's file, no library scan
+                scratch = _make_scratch(self.download_dir)
+                try:
+                    out_template = str(scratch / self.TRACK_TEMPLATE)
+                    await self._run_spotdl(self._spotdl_cmd([url], out_template), context, warnings)
+                    path = _move_into(self._newest_m4a(scratch), self.download_dir)
+                finally:
+                    shutil.rmtree(scratch, ignore_errors=True)
+        except BaseException:
+            meta_task.cancel()
+            raise
+        return [(await meta_task, path)]
+
+    def _existing_track_file(self, url: str, warnings: Warnings) -> Optional[Path]:
+        tr_id = _TRACK_URL_RE.search(url)
+        data = self._fetch_tracks([tr_id.group(1)], warnings)[0] if tr_id else None
+        if not data:
+            return None
+        path = self.download_dir / _spotdl_filename(self.TRACK_TEMPLATE, data)
+        return path if path.is_file() else None
 
-        files = sorted(self.download_dir.glob("*.m4a"), key=lambda p: p.stat().st_mtime)
-        if not files:
+    @staticmethod
+    def _newest_m4a(directory: Path) -> Path:
+        # Single pass, no sort: the newest .m4a is the one this run wrote.
+        # DirEntry.stat() reuses what scandir already read where it can.
+        with os.scandir(directory) as it:
+            newest = max(
+                (e for e in it if e.name.endswith(".m4a") and e.is_file()),
+                key=lambda e: e.stat(follow_symlinks=False).st_mtime,
+                default=None,
+            )
+        if newest is None:
             raise RuntimeError("No file downloaded for track")
+        return Path(newest.path)
+
+    async def _track_meta_with_cover(self, url: str, warnings: Warnings) -> Dict[str, Any]:
+        meta = await asyncio.to_thread(self._track_meta_for, url, warnings)
+        if meta.get("cover_url"):
+            got = await self._fetch_cover(meta["cover_url"], url, warnings)
+            if got:
+                meta["cover_bytes"] = got[0]
+        return meta
 
-        tr_id = re.search(r"track/([0-9A-Za-z]+)", url)
-        data = self.sp.track(tr_id.group(1)) if tr_id else {}
-        meta = self._track_meta_from_spotify_obj(data) if data else {}
-        return [(meta, files[-1])]
+    def _track_meta_for(self, url: str, warnings: Warnings) -> Dict[str, Any]:
+        tr_id = _TRACK_URL_RE.search(url)
+        data = self._fetch_tracks([tr_id.group(1)], warnings)[0] if tr_id else None
+        return self._track_meta_from_spotify_obj(data) if data else {}
 
     @staticmethod
     def _track_meta_from_spotify_obj(data: Dict[str, Any]) -> Dict[str, Any]:
         if not data:
             return {}
-        album = data.get("album", {})
+        get = data.get
+        album_get = (get("album") or _EMPTY).get
         return {
-            "title":        data.get("name"),
-            "artist":       ", ".join(a["name"] for a in data.get("artists", [])),
-            "album":        album.get("name"),
-            "album_artist": ", ".join(a["name"] for a in album.get("artists", [])),
-            "track_number": data.get("track_number"),
-            "disc_number":  data.get("disc_number"),
-            "release_date": album.get("release_date"),
+            "title":        get("name"),
+            "artist":       _join_names(get("artists")),
+            "album":        album_get("name"),
+            "album_artist": _join_names(album_get("artists")),
+            "track_number": get("track_number"),
+            "disc_number":  get("disc_number"),
+            "release_date": album_get("release_date"),
             "genre":        None,
-            "duration":     (data.get("duration_ms") or 0) // 1000,
-            "isrc":         (data.get("external_ids") or {}).get("isrc"),
-            "popularity":   data.get("popularity"),
-            "cover_url":    (album.get("images") or [{}])[0].get("url"),
+            "duration":     (get("duration_ms") or 0) // 1000,
+            "isrc":         _dig(data, "external_ids", "isrc"),
+            "popularity":   get("popularity"),
+            "cover_url":    _cover_url_of(data),
             "cover_bytes":  None,
-            "url":          (data.get("external_urls") or {}).get("spotify"),
+            "url":          _dig(data, "external_urls", "spotify"),
         }
 
     # ------------------------------------------------------------------ #
@@ -311,14 +814,17 @@ class SpotifyDownloader:
         link_type: str,
     ) -> Tuple[List[SuccessItem], List[FailItem], List[WarnItem]]:
         """
-        Async entrypoint: off-load blocking work into a thread.
-        """
-        loop = asyncio.get_running_loop()
-        self.warnings = []
-        func = partial(self._sync_download, url, link_type)
+        Async entrypoint. spotDL runs as asyncio subprocesses; blocking
+        Spotipy/HTTP calls are pushed to threads via asyncio.to_thread.
 
+        Warnings are collected per call and handed down explicitly, so
+        overlapping downloads on one instance never share or reset them.
+        """
+        warnings: Warnings = deque()
         try:
-            successes = await loop.run_in_executor(None, func)
-            return successes, [], self.warnings
+            if link_type == "track":
+                return await self._download_track(url, warnings), [], list(warnings)
+            successes, failures = await self._download_collection(url, link_type, warnings)
+            return successes, failures, list(warnings)
         except Exception as e:
-            return [], [(url, str(e))], self.warnings
+            return [], [(url, str(e))], list(warnings)
@@ -1,15 +1,45 @@
 # downloaders/youtube.py
 
+import os
 import re
+import json
+import logging
 import time
+import random
+import sqlite3
 import asyncio
-from functools import partial
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Optional, Mapping, Literal
 
 import yt_dlp
+from yt_dlp.utils import (
+    DownloadError,
+    ExtractorError,
+    GeoRestrictedError,
+    PostProcessingError,
+    UnsupportedError,
+)
+
+from utils import LRUCache
+
+try:
+    from yt_dlp.networking.exceptions import TransportError
+except ImportError:  # pragma: no cover - yt-dlp before the networking rewrite
+    TransportError = OSError
 
 # Optional imports: YouTube Music and Spotify metadata enrichment
+try:
+    import requests  # both enrichment clients run on requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:  # pragma: no cover
+    requests = None
+
 try:
     from ytmusicapi import YTMusic  # type: ignore
 except ImportError:  # pragma: no cover
@@ -26,14 +56,174 @@ except ImportError:  # pragma: no cover
 SuccessItem = Tuple[Dict[str, Any], Path]
 WarnItem    = Tuple[str, str]
 FailItem    = Tuple[str, str]
+Warnings    = List[WarnItem]  # per-download sink, appended from tasks and pool threads
 
 MAX_RETRIES   = 3
 INITIAL_DELAY = 5  # seconds
+PLAYLIST_WORKERS = 5  # playlist items downloaded in parallel
+DOWNLOAD_WORKERS = 8  # concurrent download() calls across all users
+YDL_PER_THREAD = 4  # YoutubeDL instances kept per pool thread and downloader
+
+# Substrings of yt-dlp errors worth retrying (server-side / network trouble)
+_TRANSIENT_MARKERS = (
+    "http error 5",
+    "http error 429",
+    "timed out",
+    "temporary failure",
+    "connection reset",
+    "connection aborted",
+    "remote end closed",
+    "incompleteread",
+)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """
+    Retry only what can succeed later: network errors and 429/5xx. Known
+    terminal yt-dlp errors (unsupported URL, geo block, private video,
+    ffmpeg failures) fail fast. DownloadError wraps the original in exc_info.
+    """
+    orig = exc
+    exc_info = getattr(exc, "exc_info", None)
+    if isinstance(exc, DownloadError) and exc_info and exc_info[1] is not None:
+        orig = exc_info[1]
+    text = str(exc).lower()
+    if any(marker in text for marker in _TRANSIENT_MARKERS):
+        return True
+    if isinstance(orig, (UnsupportedError, GeoRestrictedError, PostProcessingError)):
+        return False
+    if isinstance(orig, ExtractorError):
+        return not orig.expected
+    return isinstance(orig, (OSError, TransportError))
+
+
+# Shared read-only fallback for `(x or _EMPTY).get(...)`: no dict per miss
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# Left-over thumbnails, never the audio file
+_THUMB_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+# Dedicated pool for blocking yt-dlp work (network, ffmpeg, file I/O), shared
+# by all downloaders (main.py keeps one per user), and the loop's default
+# executor is left to everything else. Created on first use.
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+# Metadata searches issued alongside one another; a separate pool, as its
+# callers already run on the download pools and must not wait on themselves.
+_LOOKUP_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdl-lookup")
+
+
+def _default_pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="ytdl")
+        return _POOL
+
+
+@lru_cache(maxsize=1)
+def _http_session() -> "requests.Session":
+    """
+    Keep-alive session shared by the YTMusic and Spotify enrichment clients
+    of every downloader (one per user), so lookups reuse TLS connections;
+    retries with backoff on 429/5xx. Built on first use (only reached when
+    ytmusicapi or spotipy, and so requests, is installed).
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,  # YTMusic searches are POSTs
+        ),
+    ))
+    return session
+
+
+# (artist, title) -> frozen enrichment fields; a day is short enough for
+# popularity-like fields to refresh. Failed searches are not cached.
+# Module level, so lookups are shared across the per-user downloaders.
+_YTM_CACHE = LRUCache(4096, ttl=86400)
+_SP_CACHE  = LRUCache(4096, ttl=86400)
+
+# (playlist URL, cookie file) -> flat probe result; playlists change, keep it short
+_PROBE_CACHE = LRUCache(64, ttl=60)
+
+
+class _MetaCache:
+    """
+    Persistent enrichment cache: YouTube video ID -> enrichment updates
+    (JSON), so re-downloads skip YTMusic/Spotify even after a restart.
+    One WAL-mode connection per database file, shared by all threads.
+    Rows older than TTL are deleted when the file is opened.
+    """
+
+    TTL = 30 * 86400  # seconds
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "youtube_id TEXT PRIMARY KEY, fetched_at INTEGER NOT NULL, payload TEXT NOT NULL)"
+        )
+        # get() already ignores them; without this they'd pile up forever
+        self._db.execute("DELETE FROM meta WHERE fetched_at < ?", (int(time.time()) - self.TTL,))
+
+    def get(self, youtube_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM meta WHERE youtube_id = ? AND fetched_at >= ?",
+                (youtube_id, int(time.time()) - self.TTL),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, youtube_id: str, updates: Dict[str, Any]) -> None:
+        payload = json.dumps(updates, ensure_ascii=False, default=str)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (youtube_id, fetched_at, payload) VALUES (?, ?, ?)",
+                (youtube_id, int(time.time()), payload),
+            )
+
+
+_META_CACHES: Dict[str, _MetaCache] = {}
+_META_CACHES_LOCK = threading.Lock()
+
+
+def _meta_cache(path: Path) -> _MetaCache:
+    # downloaders are per user; the database connection is per file
+    key = str(path.expanduser().resolve())
+    with _META_CACHES_LOCK:
+        cache = _META_CACHES.get(key)
+        if cache is None:
+            cache = _META_CACHES[key] = _MetaCache(Path(key))
+        return cache
+
+
+def _lookup_key(artist: Optional[str], title: Optional[str]) -> Tuple[str, str]:
+    return (artist or "").casefold().strip(), (title or "").casefold().strip()
+
+
+_UNSAFE_CHARS = frozenset('\\/:"*?<>|')
+_SANITIZE_RE  = re.compile(r'[\\/:"*?<>|]+')
 
 
 def sanitize_filename(name: str) -> str:
     """Replace filesystem-unsafe characters with underscores."""
-    return re.sub(r'[\\/:"*?<>|]+', "_", name)
+    # Most titles are already clean: a set test, no regex scan
+    if _UNSAFE_CHARS.isdisjoint(name):
+        return name
+    return _SANITIZE_RE.sub("_", name)
 
 
 # ---------------------- #
@@ -50,7 +240,13 @@ def _coerce_int(v: Any) -> Optional[int]:
         return v
     if isinstance(v, (list, tuple)) and v:
         return _coerce_int(v[0])
-    s = str(v)
+    if isinstance(v, str):
+        return _coerce_int_str(v)
+    return _coerce_int_str(str(v))
+
+@lru_cache(maxsize=4096)
+def _coerce_int_str(s: str) -> Optional[int]:
+    # same few values (track/disc numbers) over and over within a playlist
     m = _NUM_RE.match(s)
     if m:
         try:
@@ -67,61 +263,68 @@ def _year_from(v: Any) -> Optional[str]:
         return None
     if isinstance(v, (list, tuple)) and v:
         return _year_from(v[0])
-    s = str(v)
+    return _year_from_str(v if isinstance(v, str) else str(v))
+
+@lru_cache(maxsize=4096)
+def _year_from_str(s: str) -> Optional[str]:
     m = _DATE_RE.match(s)
     return m.group(1) if m else None
 
+@lru_cache(maxsize=4096)
 def _split_artist_title(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
     """
     Simple heuristic: 'Artist - Title'.
     """
     if not text:
         return None, None
+    if "–" not in text:
+        # plain hyphen only: partition == _SPLIT_RE split (whitespace is stripped anyway)
+        head, sep, tail = text.partition("-")
+        if not sep:
+            return None, None
+        return head.strip() or None, tail.strip() or None
     parts = _SPLIT_RE.split(text, maxsplit=1)
     if len(parts) != 2:
         return None, None
     return parts[0].strip() or None, parts[1].strip() or None
 
+# Huge / non-embeddable fields (downstream embedder may ignore anyway)
+_DROP_KEYS = frozenset({"description", "tags", "view_count", "like_count", "popularity"})
+
 def _normalize_meta_for_export(base: Dict[str, Any], *, platform: str) -> Dict[str, Any]:
     """
     Produce a shallow copy of base meta, coercing values into simple
     scalar forms that downstream embedders (Mutagen) accept cleanly.
     We also add a couple of source hints for later TagLookup merging.
     """
-    m = dict(base)  # shallow copy
+    # shallow copy without the dropped fields, in one pass
+    m = {k: v for k, v in base.items() if k not in _DROP_KEYS}
 
     # Guarantee artist/album_artist consistency
-    if not m.get("artist") and m.get("album_artist"):
-        m["artist"] = m["album_artist"]
-    if not m.get("album_artist") and m.get("artist"):
-        m["album_artist"] = m["artist"]
+    artist, album_artist = m.get("artist"), m.get("album_artist")
+    if not artist and album_artist:
+        m["artist"] = album_artist
+    elif artist and not album_artist:
+        m["album_artist"] = artist
 
     # Track / disc numbers
-    tn = _coerce_int(m.get("track_number"))
-    if tn is not None:
-        m["track_number"] = tn
-    else:
-        m.pop("track_number", None)
-
-    dn = _coerce_int(m.get("disc_number"))
-    if dn is not None:
-        m["disc_number"] = dn
-    else:
-        m.pop("disc_number", None)
+    for key in ("track_number", "disc_number"):
+        n = _coerce_int(m.get(key))
+        if n is not None:
+            m[key] = n
+        else:
+            m.pop(key, None)
 
     # Year (for ID3/MP4 'date' convenience)
     yr = _year_from(m.get("release_date"))
     if yr:
         m["date"] = yr
 
-    # Remove huge / non-embeddable fields (downstream embedder may ignore anyway)
-    for k in ("description", "tags", "view_count", "like_count", "popularity"):
-        m.pop(k, None)
-
     # Source hints (for TagLookup merge logic)
     m.setdefault("source_platform", platform)
-    if m.get("url"):
-        m.setdefault("source_url", m["url"])
+    url = m.get("url")
+    if url:
+        m.setdefault("source_url", url)
 
     return m
 
@@ -148,8 +351,17 @@ class YouTubeDownloader:
         # Output template override. If None, sensible defaults are used per link_type.
         output_template_track: Optional[str] = None,
         output_template_playlist: Optional[str] = None,
+        # Pool for the blocking work; defaults to the module-wide one.
+        executor: Optional[ThreadPoolExecutor] = None,
+        # SQLite file for the persistent enrichment cache (None: disabled)
+        meta_cache: Optional[str | Path] = None,
+        # "mp3" re-encodes the downloaded stream (320 kbps) via ffmpeg
+        audio_codec: Literal["m4a", "mp3"] = "m4a",
     ):
+        self.log = logging.getLogger("YouTubeDownloader")
         self.download_dir = download_dir
+        self.audio_codec = audio_codec
+        self._pool = executor
 
         # Normalize cookie path (allow str)
         self.cookie_file: Optional[Path] = Path(cookie_file) if cookie_file else None
@@ -162,30 +374,41 @@ class YouTubeDownloader:
         self.ytmusic = None
         if self.enrich_from_ytmusic:
             try:
-                self.ytmusic = YTMusic()  # anonymous unless auth headers provided
+                # anonymous unless auth headers provided
+                self.ytmusic = YTMusic(requests_session=_http_session())
             except Exception as e:  # degrade gracefully
                 self.enrich_from_ytmusic = False
-                print(f"[YouTubeDownloader] YTMusic init failed: {e}")
+                self.log.warning("YTMusic init failed: %s", e)
 
         # init Spotify client if requested
         self.sp = None
         if self.enrich_from_spotify and spotify_creds and SpotifyClientCredentials:
             try:
+                session = _http_session()
                 auth = SpotifyClientCredentials(
                     client_id=spotify_creds["client_id"],
                     client_secret=spotify_creds["client_secret"],
+                    requests_session=session,
                 )
-                self.sp = spotipy.Spotify(auth_manager=auth)
+                self.sp = spotipy.Spotify(auth_manager=auth, requests_session=session)
             except Exception as e:
                 self.enrich_from_spotify = False
-                print(f"[YouTubeDownloader] Spotify client init failed: {e}")
+                self.log.warning("Spotify client init failed: %s", e)
+
+        # persistent enrichment cache, only useful with an enrichment source
+        self.meta_cache: Optional[_MetaCache] = None
+        if meta_cache and (self.enrich_from_ytmusic or self.enrich_from_spotify):
+            try:
+                self.meta_cache = _meta_cache(Path(meta_cache))
+            except sqlite3.Error as e:
+                self.log.warning("metadata cache unavailable: %s", e)
 
         # custom output templates (yt-dlp style)
         self.output_template_track    = output_template_track
         self.output_template_playlist = output_template_playlist
 
-        # per-download warnings
-        self.warnings: List[WarnItem] = []
+        # per-thread YoutubeDL instances (see _ydl_for)
+        self._ydl_local = threading.local()
 
     # ------------------------------------------------------------------ #
     # Public async API
@@ -196,50 +419,99 @@ class YouTubeDownloader:
         link_type: str,
     ) -> Tuple[List[SuccessItem], List[FailItem], List[WarnItem]]:
         """
-        Async entrypoint: off-load blocking work into a thread.
+        Async entrypoint. Each blocking step (one yt-dlp attempt, metadata
+        building) runs in a thread of the downloader's pool (not the loop's
+        default executor); retry back-off waits in the event loop, so it
+        doesn't hold a pool thread.
+
+        Warnings are collected per call and handed down explicitly, so
+        overlapping downloads on one instance never share or reset them.
         """
-        loop = asyncio.get_running_loop()
-        self.warnings = []
-        fn = partial(self._sync_download, url, link_type)
+        warnings: Warnings = []
         try:
-            successes = await loop.run_in_executor(None, fn)
-            return successes, [], self.warnings
+            if link_type == "track":
+                return await self._download_single(url, warnings), [], warnings
+            # treat everything else as playlist (channel uploads, watch later, etc.)
+            successes, failures = await self._download_playlist(url, warnings)
+            return successes, failures, warnings
         except Exception as e:
-            return [], [(url, str(e))], self.warnings
+            return [], [(url, str(e))], warnings
 
-    # ------------------------------------------------------------------ #
-    # Internal sync worker dispatch
-    # ------------------------------------------------------------------ #
-    def _sync_download(self, url: str, link_type: str) -> List[SuccessItem]:
-        if link_type == "track":
-            return self._download_single(url)
-        else:
-            # treat everything else as playlist (channel uploads, watch later, etc.)
-            return self._download_playlist(url)
+    async def _in_pool(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool or _default_pool(), partial(fn, *args))
 
     # ------------------------------------------------------------------ #
     # yt-dlp runner with retries
     # ------------------------------------------------------------------ #
-    def _run_ytdlp(self, opts: Dict[str, Any], context: str) -> Tuple[yt_dlp.YoutubeDL, dict]:
+    async def _run_ytdlp(
+        self,
+        opts: Dict[str, Any],
+        context: str,
+        warnings: Warnings,
+        *,
+        download: bool = True,
+        extra_info: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[yt_dlp.YoutubeDL, dict]:
         """
         Invoke yt-dlp with retries, return (ydl, info_dict).
+        extra_info is merged into the info dict (usable in outtmpl).
         """
         delay = INITIAL_DELAY
         last_exc: Optional[Exception] = None
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                ydl = yt_dlp.YoutubeDL(opts)
-                info = ydl.extract_info(opts["url"], download=True)
-                return ydl, info
+                return await self._in_pool(self._run_ytdlp_once, opts, download, extra_info)
             except Exception as e:  # broad; yt-dlp throws many
                 last_exc = e
-                self.warnings.append((context, f"yt-dlp failed on attempt {attempt}: {e}"))
+                warnings.append((context, f"yt-dlp failed on attempt {attempt}: {e}"))
+                if not _is_transient(e):
+                    # unsupported / private / geo-blocked etc. won't heal with time
+                    raise RuntimeError(f"YouTube download failed: {e}")
                 if attempt == MAX_RETRIES:
                     raise RuntimeError(f"YouTube download failed after {MAX_RETRIES} attempts: {e}")
-                time.sleep(delay)
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))  # jitter: no synchronized retry bursts
                 delay *= 2
         raise RuntimeError(f"yt-dlp failed: {last_exc}")
 
+    def _run_ytdlp_once(
+        self,
+        opts: Dict[str, Any],
+        download: bool,
+        extra_info: Optional[Dict[str, Any]],
+    ) -> Tuple[yt_dlp.YoutubeDL, dict]:
+        """Single blocking yt-dlp attempt (pool thread); raises on failure."""
+        ydl = self._ydl_for(opts)
+        return ydl, ydl.extract_info(opts["url"], download=download, extra_info=extra_info or {})
+
+    def _ydl_for(self, opts: Dict[str, Any]) -> yt_dlp.YoutubeDL:
+        """
+        YoutubeDL for these options, built once per worker thread and then
+        reused across retries and playlist items (construction sets up
+        extractors and post-processors). Instances aren't shared between
+        threads; "url" is ours, not a yt-dlp param, so it's not part of the key.
+
+        The key includes outtmpl, which names the playlist folder, so every
+        playlist gets its own instance: a small per-thread LRU keeps the
+        downloader (reused for all of a user's messages) from accumulating
+        one per playlist; evicted instances are closed.
+        """
+        cache = getattr(self._ydl_local, "cache", None)
+        if cache is None:
+            cache = self._ydl_local.cache = OrderedDict()
+        key = repr(sorted((k, v) for k, v in opts.items() if k != "url"))
+        ydl = cache.get(key)
+        if ydl is not None:
+            cache.move_to_end(key)
+            return ydl
+        ydl = cache[key] = yt_dlp.YoutubeDL(opts)
+        while len(cache) > YDL_PER_THREAD:
+            # not in use: this thread is the only one running its instances,
+            # and the result helpers after a run only call prepare_filename
+            _, old = cache.popitem(last=False)
+            old.close()
+        return ydl
+
     # ------------------------------------------------------------------ #
     # Helper: build common yt-dlp options block
     # ------------------------------------------------------------------ #
@@ -251,11 +523,23 @@ class YouTubeDownloader:
             "format":         "bestaudio[ext=m4a]/bestaudio/best",
             "quiet":          True,
             "writethumbnail": True,
+            # Fragmented (DASH/HLS) streams: fetch fragments in parallel; a
+            # no-op for single-file M4A. Kept moderate since playlist items
+            # already download PLAYLIST_WORKERS at a time.
+            "concurrent_fragment_downloads": 4,
+            "http_chunk_size":  10 * 1024 * 1024,  # ranged requests dodge per-connection throttling
+            "retries":          10,
+            "fragment_retries": 10,
             "postprocessors": [
                 {"key": "EmbedThumbnail"},
                 {"key": "FFmpegMetadata"},  # ask yt-dlp/ffmpeg to write basic tags
             ],
         }
+        if self.audio_codec == "mp3":
+            # convert before the thumbnail/tags are embedded into the final file
+            opts["postprocessors"].insert(
+                0, {"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "320"}
+            )
         if self.cookie_file:
             opts["cookiefile"] = str(self.cookie_file)
         return opts
@@ -263,7 +547,7 @@ class YouTubeDownloader:
     # ------------------------------------------------------------------ #
     # Single video download
     # ------------------------------------------------------------------ #
-    def _download_single(self, url: str) -> List[SuccessItem]:
+    async def _download_single(self, url: str, warnings: Warnings) -> List[SuccessItem]:
         outtmpl = (
             self.output_template_track
             or str(self.download_dir / "%(uploader,channel)s - %(title)s.%(ext)s")
@@ -271,33 +555,39 @@ class YouTubeDownloader:
         opts = self._base_opts()
         opts.update({"url": url, "outtmpl": outtmpl})
 
-        ydl, info = self._run_ytdlp(opts, context=url)
+        ydl, info = await self._run_ytdlp(opts, url, warnings)
+        return [await self._in_pool(self._single_result, ydl, info, warnings)]
 
+    def _single_result(
+        self,
+        ydl: yt_dlp.YoutubeDL,
+        info: Dict[str, Any],
+        warnings: Warnings,
+    ) -> SuccessItem:
         raw_path = Path(ydl.prepare_filename(info))
-        path = raw_path.with_suffix(".m4a")  # expected audio format
+        path = raw_path.with_suffix(f".{self.audio_codec}")  # expected audio format
 
         meta = self._meta_from_info_dict(info, playlist_title=None, playlist_index=None)
-        meta.update(self._enrich_metadata(meta))
+        meta.update(self._cached_enrichment(info.get("id"), meta, warnings))
         meta = _normalize_meta_for_export(meta, platform="youtube")
 
-        return [(meta, path)]
+        return meta, path
 
     # ------------------------------------------------------------------ #
     # Playlist download
     # ------------------------------------------------------------------ #
-    def _download_playlist(self, url: str) -> List[SuccessItem]:
-        probe_title = "(playlist)"
-        probe_uploader = ""
-        try:
-            probe_opts = {"url": url, "quiet": True, "skip_download": True}
-            if self.cookie_file:
-                probe_opts["cookiefile"] = str(self.cookie_file)
-            with yt_dlp.YoutubeDL(probe_opts) as probe:
-                info = probe.extract_info(url, download=False)
-                probe_title = info.get("title", probe_title)
-                probe_uploader = info.get("uploader") or info.get("channel") or ""
-        except Exception as e:
-            self.warnings.append((url, f"yt-dlp probe failed: {e}"))
+    async def _download_playlist(
+        self,
+        url: str,
+        warnings: Warnings,
+    ) -> Tuple[List[SuccessItem], List[FailItem]]:
+        """
+        Flat-probe the playlist for its entries, then download them as
+        independent single-video jobs, at most PLAYLIST_WORKERS at a time,
+        so one item's ffmpeg post-processing overlaps with the next items'
+        network fetch.
+        """
+        probe_title, probe_uploader, entries = await self._probe_playlist(url, warnings)
 
         folder = sanitize_filename(f"{probe_uploader} - {probe_title}" if probe_uploader else probe_title)
         pl_dir = self.download_dir / folder
@@ -307,38 +597,110 @@ class YouTubeDownloader:
             self.output_template_playlist
             or str(pl_dir / "%(playlist_index)03d - %(title)s.%(ext)s")
         )
-        opts = self._base_opts()
-        opts.update({"url": url, "outtmpl": outtmpl})
-        self._run_ytdlp(opts, context=folder)
-
-        files = sorted(pl_dir.glob("*.m4a"))
-
-        # Re-probe entries
-        entries: List[dict] = []
-        try:
-            probe_opts = {"url": url, "quiet": True, "skip_download": True}
-            if self.cookie_file:
-                probe_opts["cookiefile"] = str(self.cookie_file)
-            with yt_dlp.YoutubeDL(probe_opts) as probe:
-                info = probe.extract_info(url, download=False)
-                entries = info.get("entries", []) or []
-        except Exception as e:
-            self.warnings.append((url, f"yt-dlp re-probe failed: {e}"))
-
-        results: List[SuccessItem] = []
-        for idx, p in enumerate(files):
-            entry = entries[idx] if idx < len(entries) else {}
-            playlist_index = entry.get("playlist_index") or (idx + 1)
-            meta = self._meta_from_info_dict(
-                entry,
-                playlist_title=probe_title,
-                playlist_index=playlist_index,
-            )
-            meta.update(self._enrich_metadata(meta))
-            meta = _normalize_meta_for_export(meta, platform="youtube")
-            results.append((meta, p))
+        sem = asyncio.Semaphore(PLAYLIST_WORKERS)
+
+        async def _download_one(pos: int, entry: Dict[str, Any]) -> Tuple[int, SuccessItem]:
+            playlist_index = entry.get("playlist_index") or pos
+            entry_url = entry.get("url") or entry.get("webpage_url") or entry.get("id")
+            opts = self._base_opts()
+            opts.update({"url": entry_url, "outtmpl": outtmpl, "noplaylist": True})
+            async with sem:
+                # playlist fields aren't set for a single-video run; hand them in
+                # so the playlist outtmpl renders the same as a whole-list run
+                ydl, item = await self._run_ytdlp(
+                    opts,
+                    f"{folder} #{playlist_index}",
+                    warnings,
+                    extra_info={
+                        "playlist": probe_title,
+                        "playlist_title": probe_title,
+                        "playlist_index": playlist_index,
+                    },
+                )
+                return playlist_index, await self._in_pool(
+                    self._playlist_item_result, ydl, item, probe_title, playlist_index, warnings
+                )
 
-        return results
+        outcomes = await asyncio.gather(
+            *(_download_one(pos, e) for pos, e in enumerate(entries, 1)),
+            return_exceptions=True,
+        )
+        done: List[Tuple[int, SuccessItem]] = []
+        failures: List[FailItem] = []
+        for entry, outcome in zip(entries, outcomes):  # gather keeps playlist order
+            if isinstance(outcome, Exception):
+                failures.append((entry.get("title") or entry.get("url") or folder, str(outcome)))
+            else:
+                done.append(outcome)
+
+        if not self.output_template_playlist and done:
+            done = await self._in_pool(self._resolve_missing, pl_dir, done)
+        return [item for _, item in done], failures
+
+    def _playlist_item_result(
+        self,
+        ydl: yt_dlp.YoutubeDL,
+        item: Dict[str, Any],
+        playlist_title: str,
+        playlist_index: int,
+        warnings: Warnings,
+    ) -> SuccessItem:
+        path = Path(ydl.prepare_filename(item)).with_suffix(f".{self.audio_codec}")
+        meta = self._meta_from_info_dict(
+            item,
+            playlist_title=playlist_title,
+            playlist_index=playlist_index,
+        )
+        meta.update(self._cached_enrichment(item.get("id"), meta, warnings))
+        return _normalize_meta_for_export(meta, platform="youtube"), path
+
+    @staticmethod
+    def _resolve_missing(
+        pl_dir: Path,
+        done: List[Tuple[int, SuccessItem]],
+    ) -> List[Tuple[int, SuccessItem]]:
+        # The expected name assumes the audio_codec suffix; when yt-dlp ended up with
+        # another container, find the item by its "NNN - " prefix instead
+        # (one scandir pass, only if something is actually missing).
+        if all(p.is_file() for _, (_, p) in done):
+            return done
+        by_index: Dict[int, Path] = {}
+        with os.scandir(pl_dir) as it:
+            for e in it:
+                head = e.name[:3]
+                if head.isdigit() and e.is_file(follow_symlinks=False) and not e.name.endswith(_THUMB_EXTS):
+                    by_index.setdefault(int(head), Path(e.path))
+        return [
+            (idx, (meta, p if p.is_file() else by_index.get(idx, p)))
+            for idx, (meta, p) in done
+        ]
+
+    async def _probe_playlist(self, url: str, warnings: Warnings) -> Tuple[str, str, List[Dict[str, Any]]]:
+        """
+        One flat extract_info for the playlist: (title, uploader, entries).
+        Memoized briefly, so a re-sent link skips the listing altogether.
+        """
+        key = (url, str(self.cookie_file or ""))
+        cached = _PROBE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        probe_opts: Dict[str, Any] = {
+            "url": url,
+            "quiet": True,
+            "skip_download": True,
+            "extract_flat": "in_playlist",  # entry URLs only, no per-video extraction
+        }
+        if self.cookie_file:
+            probe_opts["cookiefile"] = str(self.cookie_file)
+        _, info = await self._run_ytdlp(probe_opts, url, warnings, download=False)
+        result = (
+            info.get("title") or "(playlist)",
+            info.get("uploader") or info.get("channel") or "",
+            [e for e in (info.get("entries") or []) if e],
+        )
+        _PROBE_CACHE.put(key, result)
+        return result
 
     # ------------------------------------------------------------------ #
     # Base metadata extraction from yt-dlp info dict
@@ -379,7 +741,43 @@ class YouTubeDownloader:
     # ------------------------------------------------------------------ #
     # Metadata enrichment pipeline
     # ------------------------------------------------------------------ #
-    def _enrich_metadata(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+    def _cached_enrichment(
+        self,
+        video_id: Optional[str],
+        meta: Dict[str, Any],
+        warnings: Warnings,
+    ) -> Dict[str, Any]:
+        """
+        _enrich_metadata through the persistent per-video cache (write-through).
+        """
+        if not (self.meta_cache and video_id):
+            return self._enrich_metadata(meta, warnings)[0]
+        try:
+            cached = self.meta_cache.get(video_id)
+        except sqlite3.Error as e:
+            warnings.append(("meta-cache", f"read failed: {e}"))
+            cached = None
+        if cached is not None:
+            return cached
+        updates, ok = self._enrich_metadata(meta, warnings)
+        if not ok:
+            # a search failed: don't pin a possibly incomplete result for 30 days
+            return updates
+        try:
+            self.meta_cache.put(video_id, updates)
+        except sqlite3.Error as e:
+            warnings.append(("meta-cache", f"write failed: {e}"))
+        return updates
+
+    def _enrich_metadata(
+        self,
+        meta: Dict[str, Any],
+        warnings: Warnings,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        (updates, ok): ok is False when a search that ran failed, i.e. the
+        updates may be missing fields a retry would find.
+        """
         parsed_artist, parsed_title = _split_artist_title(meta["title"])
         updates: Dict[str, Any] = {}
         if not meta.get("artist") and parsed_artist:
@@ -387,59 +785,108 @@ class YouTubeDownloader:
         if parsed_title and parsed_title != meta["title"]:
             updates["title"] = parsed_title
 
+        use_yt = self.enrich_from_ytmusic and self.ytmusic
+        use_sp = self.enrich_from_spotify and self.sp
+
+        # YT Music never supplies a track number: when it's missing, the
+        # Spotify fallback below runs regardless, so start it right away in
+        # parallel with the YT Music search instead of after it.
+        sp_future = None
+        if use_yt and use_sp and meta.get("track_number") is None:
+            sp_future = _LOOKUP_POOL.submit(
+                self._enrich_from_spotify,
+                artist=updates.get("artist") or meta.get("artist"),
+                title=updates.get("title") or meta.get("title"),
+                warnings=warnings,
+            )
+
+        ok = True
         # YT Music first
-        if self.enrich_from_ytmusic and self.ytmusic:
+        if use_yt:
             yt_upd = self._enrich_from_ytmusic(
                 artist=updates.get("artist") or meta.get("artist"),
                 title=updates.get("title") or meta.get("title"),
+                warnings=warnings,
             )
-            updates.update({k: v for k, v in yt_upd.items() if v is not None})
+            if yt_upd is None:
+                ok, yt_upd = False, {}
+            for k, v in yt_upd.items():
+                if v is not None:
+                    updates[k] = v
 
         # Spotify fallback for album/track no.
         need_album = not (updates.get("album") or meta.get("album"))
         need_trkno = updates.get("track_number") is None and meta.get("track_number") is None
-        if self.enrich_from_spotify and self.sp and (need_album or need_trkno):
-            sp_upd = self._enrich_from_spotify(
+        if use_sp and (need_album or need_trkno):
+            sp_upd = sp_future.result() if sp_future else self._enrich_from_spotify(
                 artist=updates.get("artist") or meta.get("artist"),
                 title=updates.get("title") or meta.get("title"),
+                warnings=warnings,
             )
-            updates.update({k: v for k, v in sp_upd.items() if v is not None})
+            if sp_upd is None:
+                ok, sp_upd = False, {}
+            for k, v in sp_upd.items():
+                if v is not None:
+                    updates[k] = v
 
-        return updates
+        return updates, ok
 
     # ------------------------------------------------------------------ #
     # YT Music enrichment
     # ------------------------------------------------------------------ #
-    def _enrich_from_ytmusic(self, artist: Optional[str], title: Optional[str]) -> Dict[str, Any]:
+    def _enrich_from_ytmusic(
+        self,
+        artist: Optional[str],
+        title: Optional[str],
+        warnings: Warnings,
+    ) -> Optional[Dict[str, Any]]:
+        """Best match as tag updates ({} if none); None if the search failed."""
         if not (artist or title) or not self.ytmusic:
             return {}
+        key = _lookup_key(artist, title)
+        cached = _YTM_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
         query = " ".join(x for x in [artist, title] if x)
         try:
             search = self.ytmusic.search(query, filter="songs", limit=1)
         except Exception as e:
-            self.warnings.append(("ytmusic", f"YTMusic search failed: {e}"))
-            return {}
+            warnings.append(("ytmusic", f"YTMusic search failed: {e}"))
+            return None
         if not search:
+            _YTM_CACHE.put(key, ())
             return {}
         song = search[0]
+        album_name = (song.get("album") or _EMPTY).get("name")
         upd: Dict[str, Any] = {
             "title":        song.get("title") or title,
-            "artist":       ", ".join(a["name"] for a in song.get("artists", [])) or artist,
-            "album":        (song.get("album") or {}).get("name"),
-            "album_artist": (song.get("album") or {}).get("name"),
+            "artist":       ", ".join(a["name"] for a in song.get("artists") or ()) or artist,
+            "album":        album_name,
+            "album_artist": album_name,
             "duration":     song.get("duration_seconds"),
         }
         thumbs = song.get("thumbnails") or []
         if thumbs:
             upd["cover_url"] = thumbs[-1].get("url")
+        _YTM_CACHE.put(key, tuple(upd.items()))
         return upd
 
     # ------------------------------------------------------------------ #
     # Spotify enrichment
     # ------------------------------------------------------------------ #
-    def _enrich_from_spotify(self, artist: Optional[str], title: Optional[str]) -> Dict[str, Any]:
+    def _enrich_from_spotify(
+        self,
+        artist: Optional[str],
+        title: Optional[str],
+        warnings: Warnings,
+    ) -> Optional[Dict[str, Any]]:
+        """Best match as tag updates ({} if none); None if the search failed."""
         if not self.sp or not (artist or title):
             return {}
+        key = _lookup_key(artist, title)
+        cached = _SP_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
         q_parts = []
         if title:
             q_parts.append(f'track:"{title}"')
@@ -449,24 +896,27 @@ class YouTubeDownloader:
         try:
             resp = self.sp.search(q=q, type="track", limit=1)
         except Exception as e:
-            self.warnings.append(("spotify", f"Spotify search failed: {e}"))
-            return {}
-        items = resp.get("tracks", {}).get("items", [])
+            warnings.append(("spotify", f"Spotify search failed: {e}"))
+            return None
+        items = (resp.get("tracks") or _EMPTY).get("items")
         if not items:
+            _SP_CACHE.put(key, ())
             return {}
         tr = items[0]
-        alb = tr.get("album", {})
+        alb = tr.get("album") or _EMPTY
+        images = alb.get("images")
         upd: Dict[str, Any] = {
             "title":        tr.get("name") or title,
-            "artist":       ", ".join(a["name"] for a in tr.get("artists", [])) or artist,
+            "artist":       ", ".join(a["name"] for a in tr.get("artists") or ()) or artist,
             "album":        alb.get("name"),
-            "album_artist": ", ".join(a["name"] for a in alb.get("artists", [])),
+            "album_artist": ", ".join(a["name"] for a in alb.get("artists") or ()),
             "track_number": tr.get("track_number"),
             "disc_number":  tr.get("disc_number"),
             "release_date": alb.get("release_date"),
             "duration":     (tr.get("duration_ms") or 0) // 1000,
-            "isrc":         (tr.get("external_ids") or {}).get("isrc"),
+            "isrc":         (tr.get("external_ids") or _EMPTY).get("isrc"),
             "popularity":   tr.get("popularity"),
-            "cover_url":    (alb.get("images") or [{}])[0].get("url"),
+            "cover_url":    images[0].get("url") if images else None,
         }
+        _SP_CACHE.put(key, tuple(upd.items()))
         return upd
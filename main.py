@@ -17,7 +17,7 @@ Features
   and saves under per-user subfolder.
 - Unified summary (successes / warnings / errors) for all operations.
 - Automatic metadata enrichment via TagLookup (Mutagen + AcoustID + MusicBrainz + extras),
-  then sanitized & embedded into files so Navidrome can organize library correctly.
+  sanitized there & embedded into files so Navidrome can organize library correctly.
 
 Navidrome relies primarily on embedded tags (Title, Artist, Album, Album Artist, Track No;
 plus Genre/Year/Disc strongly recommended) to group and display your library; folder layout
@@ -27,19 +27,23 @@ is secondary.  # See Navidrome docs / community guides.
 import asyncio
 import logging
 import re
+import string
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Iterable, List, Tuple, Dict, Any, Optional
 
 from aiogram import Bot, Dispatcher, types, F
+from aiogram.enums import ChatAction
 
 from config import Config
 from detector import URLDetector
-from downloaders.youtube import YouTubeDownloader
-from downloaders.spotify import SpotifyDownloader
+import downloaders  # YouTube/Spotify downloaders load lazily on first use
 from downloaders.file import FileDownloader
 # from downloaders.yandex import YandexDownloader
-from metadata import MetadataEmbedder
-from utils import setup_logging
+from metadata import MetadataEmbedder, cover_digest
+from utils import AsyncLeakyBucket, setup_logging
 
 from taglookup import TagLookup, LookupConfig
 
@@ -48,13 +52,38 @@ from taglookup import TagLookup, LookupConfig
 # Markdown helpers
 # --------------------------------------------------------------------------- #
 _MD_ESCAPE_CHARS = ("\\", "`", "*", "_", "{", "}", "[", "]", "(", ")", "#", "+", "-", ".", "!")
+_MD_TABLE = str.maketrans({ch: f"\\{ch}" for ch in _MD_ESCAPE_CHARS})
 
 def md_escape(text: str) -> str:
-    if not text:
-        return text
-    for ch in _MD_ESCAPE_CHARS:
-        text = text.replace(ch, f"\\{ch}")
-    return text
+    # single pass; same result as replacing char by char with "\\" first
+    return text.translate(_MD_TABLE) if text else text
+
+
+SUMMARY_MAX_LINES = 20  # per section; keeps a playlist summary within one message
+
+
+def _md_section(parts: List[str], title: str, rows: List[Tuple[str, ...]]) -> None:
+    """
+    Append one summary section to `parts`. Only the rows actually shown get
+    escaped; repeated texts (same warning for many tracks) are escaped once.
+    """
+    parts.append(f"*{title}:*\n")
+    if not rows:
+        parts.append("None")
+        return
+    esc: Dict[Any, str] = {}
+    for row in rows[:SUMMARY_MAX_LINES]:
+        cells = []
+        for t in row:
+            e = esc.get(t)
+            if e is None:
+                e = esc[t] = md_escape(str(t))
+            cells.append(e)
+        parts.append(f"- {': '.join(cells)}\n")
+    hidden = len(rows) - SUMMARY_MAX_LINES
+    if hidden > 0:
+        parts.append(f"_+{hidden} more_\n")
+    parts[-1] = parts[-1][:-1]  # no trailing newline
 
 
 def build_summary_md(
@@ -62,27 +91,29 @@ def build_summary_md(
     warnings: List[Tuple[str, str]],
     failures: List[Tuple[str, str]],
 ) -> str:
-    if successes:
-        downloaded_files = "\n".join(f"- {md_escape(p.name)}" for _, p in successes)
-    else:
-        downloaded_files = "None"
+    parts: List[str] = ["✅ *Download Summary*\n\n"]
+    _md_section(parts, "Successfully downloaded", [(p.name,) for _, p in successes])
+    parts.append("\n\n")
+    _md_section(parts, "Warnings", warnings)
+    parts.append("\n\n")
+    _md_section(parts, "Errors", failures)
+    return "".join(parts)
+
+
+# All outgoing bot calls (replies, chat actions) share one bucket, below
+# Telegram's 30 msg/s bot limit, so a burst from many users can't earn the
+# whole bot a 429 back-off.
+_REPLY_BUCKET = AsyncLeakyBucket(rate_per_sec=25)
+
 
-    if warnings:
-        warning_list = "\n".join(f"- {md_escape(item)}: {md_escape(msg)}" for item, msg in warnings)
-    else:
-        warning_list = "None"
+async def throttled_reply(message: types.Message, text: str, **kwargs):
+    await _REPLY_BUCKET.acquire()
+    return await message.reply(text, **kwargs)
 
-    if failures:
-        error_list = "\n".join(f"- {md_escape(item)}: {md_escape(err)}" for item, err in failures)
-    else:
-        error_list = "None"
 
-    return (
-        "✅ *Download Summary*\n\n"
-        f"*Successfully downloaded:*\n{downloaded_files}\n\n"
-        f"*Warnings:*\n{warning_list}\n\n"
-        f"*Errors:*\n{error_list}"
-    )
+async def throttled_chat_action(bot: Bot, chat_id: int, action: ChatAction):
+    await _REPLY_BUCKET.acquire()
+    return await bot.send_chat_action(chat_id, action)
 
 
 async def send_chunked(
@@ -93,91 +124,15 @@ async def send_chunked(
     chunk_size: int = 4000,
 ):
     if len(text) <= chunk_size:
-        await message.reply(text, parse_mode=parse_mode)
+        await throttled_reply(message, text, parse_mode=parse_mode)
         return
     start = 0
     while start < len(text):
         end = min(len(text), start + chunk_size)
-        await message.reply(text[start:end], parse_mode=parse_mode)
+        await throttled_reply(message, text[start:end], parse_mode=parse_mode)
         start = end
 
 
-# --------------------------------------------------------------------------- #
-# Metadata sanitization helper
-# --------------------------------------------------------------------------- #
-_NUM_RE = re.compile(r"^\s*(\d+)")
-_DATE_RE = re.compile(r"^(\d{4})")
-
-def _first_int(val: Any) -> Optional[int]:
-    """
-    Coerce common tag representations ('05', '5/12', ['5'], None) to int.
-    """
-    if val is None:
-        return None
-    if isinstance(val, int):
-        return val
-    if isinstance(val, (list, tuple)) and val:
-        return _first_int(val[0])
-    if isinstance(val, str):
-        m = _NUM_RE.match(val)
-        if m:
-            try:
-                return int(m.group(1))
-            except ValueError:
-                return None
-    try:
-        return int(val)
-    except Exception:
-        return None
-
-def _year_from_date(val: Any) -> Optional[str]:
-    if not val:
-        return None
-    if isinstance(val, (list, tuple)) and val:
-        return _year_from_date(val[0])
-    s = str(val)
-    m = _DATE_RE.match(s)
-    return m.group(1) if m else None
-
-def _sanitize_for_embed(meta: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Produce a shallow copy of meta with values coerced to simple types so Mutagen
-    won't reject them (e.g., MultiSpec errors when giving complex lists/None).
-    """
-    m2 = dict(meta)  # shallow copy
-
-    # ensure required keys exist
-    if not m2.get("artist") and m2.get("album_artist"):
-        m2["artist"] = m2["album_artist"]
-    if not m2.get("album_artist") and m2.get("artist"):
-        m2["album_artist"] = m2["artist"]
-
-    # track / disc numbers -> ints
-    tn = _first_int(m2.get("track_number"))
-    if tn is not None:
-        m2["track_number"] = tn
-    else:
-        m2.pop("track_number", None)
-
-    dn = _first_int(m2.get("disc_number"))
-    if dn is not None:
-        m2["disc_number"] = dn
-    else:
-        m2.pop("disc_number", None)
-
-    # date/year normalization
-    yr = _year_from_date(m2.get("release_date") or m2.get("date"))
-    if yr:
-        m2["date"] = yr
-
-    # drop unembeddable large objects (like cover_url) – embedder gets cover_bytes separately
-    for drop_key in ("cover_url", "url", "tags", "description", "popularity"):
-        if drop_key in m2 and m2[drop_key] is None:
-            del m2[drop_key]
-
-    return m2
-
-
 # --------------------------------------------------------------------------- #
 # Username → safe filesystem slug
 # --------------------------------------------------------------------------- #
@@ -185,6 +140,7 @@ def _sanitize_for_embed(meta: Dict[str, Any]) -> Dict[str, Any]:
 # strip leading @ if present; fallback to "id<user_id>" if empty.
 # Telegram usernames: 5–32 chars, a-z 0-9 underscore. We'll downcase for path.  # noqa: E501
 _USER_SAFE_RE = re.compile(r"[^A-Za-z0-9_-]+")
+_USER_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
 
 def _user_slug(user: types.User) -> str:
     name = user.username or ""
@@ -193,12 +149,17 @@ def _user_slug(user: types.User) -> str:
     name = name.strip()
     if not name:
         return f"id{user.id}"
-    # sanitize: replace disallowed chars with underscore
-    slug = _USER_SAFE_RE.sub("_", name)
+    # sanitize: replace disallowed chars with underscore (real usernames
+    # never have any, so skip the regex for them)
+    slug = name if _USER_SAFE_CHARS.issuperset(name) else _USER_SAFE_RE.sub("_", name)
     slug = slug.strip("._-") or f"id{user.id}"
     return slug.lower()
 
 
+USER_ROOT_CACHE_SIZE = 1024
+EMBED_WORKERS = 4  # concurrent tag writes, across all users
+
+
 # --------------------------------------------------------------------------- #
 # Main bot class
 # --------------------------------------------------------------------------- #
@@ -214,6 +175,8 @@ class MusicBot:
         self.dp = Dispatcher()
         self.allowed = set(cfg.allowed_users)
         self.base_download_dir = cfg.download_dir  # keep original root
+        self._user_roots: Dict[Tuple[int, Optional[str]], Path] = {}  # see _user_root
+        self._downloaders: Dict[Tuple[str, Path], Any] = {}  # see _downloader
 
         # Metadata lookup configuration
         ml_cfg_raw = getattr(cfg, "metadata_lookup", {}) or {}
@@ -227,8 +190,9 @@ class MusicBot:
             discogs_token=(ml_cfg_raw.get("discogs") or {}).get("token"),
             prefer_existing=ml_cfg_raw.get("prefer_existing_tags", True),
             fetch_cover_art=ml_cfg_raw.get("fetch_cover_art", True),
+            cache_path=ml_cfg_raw.get("cache_path"),
         )
-        self.tag_lookup = TagLookup(ml_cfg)
+        self.tag_lookup = TagLookup(ml_cfg)  # bot-wide: caps lookups in flight, shares album results
 
         # Resolve cookie file paths (optional)
         self.yt_cookie: Optional[Path] = None
@@ -255,6 +219,9 @@ class MusicBot:
         # self.yandex_creds = cfg.yandex
 
         self.embedder = MetadataEmbedder()
+        # Mutagen rewrites run here: off the event loop, and at most
+        # EMBED_WORKERS at once so big playlists don't thrash the disk
+        self._embed_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
         self.detector = URLDetector()
 
         # Register handlers: file first (so docs/audios don't fall through to text detector)
@@ -262,6 +229,11 @@ class MusicBot:
         self.dp.message.register(self.handle_document_message, F.document)
         # Then text messages (URLs)
         self.dp.message.register(self.handle_text_message, F.text)
+        # TagLookup and the Spotify downloader keep pooled HTTP sessions open
+        # for the bot's lifetime
+        self.dp.shutdown.register(self.tag_lookup.aclose)
+        self.dp.shutdown.register(self._close_downloaders)
+        self.dp.shutdown.register(self._close_embed_pool)
 
         self.log.info(
             "MusicBot initialized. Base download dir=%s cookie=%s",
@@ -273,17 +245,130 @@ class MusicBot:
     def _user_root(self, user: types.User) -> Path:
         """
         Return/create per-user root directory.
+
+        Memoized per (id, username), so repeat messages skip the slug and
+        mkdir; a renamed user gets a fresh entry. (Downloaders create their
+        own subfolders, so a root removed meanwhile is recreated anyway.)
         """
-        slug = _user_slug(user)
-        root = self.base_download_dir / slug
-        root.mkdir(parents=True, exist_ok=True)
+        key = (user.id, user.username)
+        root = self._user_roots.get(key)
+        if root is None:
+            if len(self._user_roots) >= USER_ROOT_CACHE_SIZE:
+                self._user_roots.clear()
+            root = self.base_download_dir / _user_slug(user)
+            root.mkdir(parents=True, exist_ok=True)
+            self._user_roots[key] = root
         return root
 
+    # ------------------------------------------------------------------ #
+    def _downloader(self, kind: str, user_root: Path):
+        """
+        Downloader of `kind` ("file", "youtube", "spotify") for a user root,
+        built on first use and then reused: the downloaders keep no
+        per-download state, and reuse keeps their clients/YoutubeDL instances.
+        """
+        key = (kind, user_root)
+        dl = self._downloaders.get(key)
+        if dl is not None:
+            return dl
+        if len(self._downloaders) >= USER_ROOT_CACHE_SIZE:
+            self._downloaders.clear()
+
+        yt_cookie_str = str(self.yt_cookie) if self.yt_cookie else None
+        if kind == "file":
+            dl = FileDownloader(
+                user_root,
+                subdir=self.fu_subdir,
+                allowed_exts=self.fu_allowed_exts,
+            )
+        elif kind == "youtube":
+            dl = downloaders.YouTubeDownloader(
+                user_root,
+                cookie_file=yt_cookie_str,
+                enrich_from_ytmusic=False,
+                enrich_from_spotify=False,
+            )
+        elif kind == "spotify":
+            dl = downloaders.SpotifyDownloader(
+                user_root,
+                self.spotify_creds,
+                cookie_file=yt_cookie_str,
+            )
+        else:
+            raise ValueError(f"Unknown downloader kind: {kind}")
+        self._downloaders[key] = dl
+        return dl
+
+    async def _close_downloaders(self) -> None:
+        # only a module that was actually loaded has a session to close
+        # (downloaders import lazily, see downloaders/__init__.py)
+        spotify = sys.modules.get("downloaders.spotify")
+        if spotify is not None:
+            await spotify.close_cover_session()
+
+    async def _close_embed_pool(self) -> None:
+        # let a tag write in progress finish instead of cutting it off at
+        # exit; waited on in a thread so the loop can close the rest meanwhile
+        await asyncio.to_thread(self._embed_pool.shutdown, wait=True)
+
+    # ------------------------------------------------------------------ #
+    async def _tag_files(
+        self,
+        successes: List[Tuple[dict, Path]],
+        warnings: List[Tuple[str, str]],
+    ) -> List[Tuple[dict, Path]]:
+        """
+        Lookup + embed tags for all downloaded files: one batched TagLookup
+        call (album-level requests are made once per album), then the
+        Mutagen writes on the embed pool. Keeps input order, appends
+        per-file warnings to `warnings`.
+        """
+        looked_up = await self.tag_lookup.lookup_batch([(path, meta) for meta, path in successes])
+
+        loop = asyncio.get_running_loop()
+
+        # Tracks of an album usually carry the same cover: shrink each distinct
+        # image once, up front, and hand every track the same bytes object
+        # (instead of N copies, each re-encoded by a different embed thread).
+        covers: Dict[bytes, List[dict]] = {}
+        for enriched, _ in looked_up:
+            raw = enriched.get("cover_bytes")
+            if raw:
+                covers.setdefault(cover_digest(raw), []).append(enriched)
+        shrunk = await asyncio.gather(*(
+            loop.run_in_executor(self._embed_pool, self.embedder.shrink_cover, group[0]["cover_bytes"])
+            for group in covers.values()
+        ))
+        for group, cover in zip(covers.values(), shrunk):
+            for enriched in group:
+                enriched["cover_bytes"] = cover
+
+        async def _embed_one(enriched: dict, path: Path) -> Optional[str]:
+            try:
+                # TagLookup already coerced the values to embeddable types
+                await loop.run_in_executor(self._embed_pool, partial(
+                    self.embedder.embed, path, enriched, enriched.get("cover_bytes")
+                ))
+            except Exception as e:
+                return f"Metadata embed error: {e}"
+            return None
+
+        embed_errors = await asyncio.gather(
+            *(_embed_one(enriched, path) for (enriched, _), (_, path) in zip(looked_up, successes))
+        )
+        tagged = []
+        for (enriched, lw), (_, path), err in zip(looked_up, successes, embed_errors):
+            warnings.extend((path.name, m) for _, m in lw)
+            if err:
+                warnings.append((path.name, err))
+            tagged.append((enriched, path))
+        return tagged
+
     # ------------------------------------------------------------------ #
     async def _authorized(self, msg: types.Message) -> bool:
         user_id = msg.from_user.id
         if user_id not in self.allowed:
-            await msg.reply("❌ You are not in the list of authorized users.")
+            await throttled_reply(msg, "❌ You are not in the list of authorized users.")
             return False
         return True
 
@@ -293,69 +378,27 @@ class MusicBot:
         Handle audio uploads (Telegram 'music' type). Telegram sends performer/title/duration;
         we enrich + embed to produce proper library tags.
         """
-        if not await self._authorized(msg):
-            return
-
-        user_root = self._user_root(msg.from_user)
-
-        # One-off FileDownloader rooted at this user's folder
-        file_dl = FileDownloader(
-            user_root,
-            subdir=self.fu_subdir,
-            allowed_exts=self.fu_allowed_exts,
-        )
-
-        await msg.reply("🔄 Received audio file, saving...")
-
-        successes, failures, warnings = await file_dl.download_message(self.bot, msg)
-
-        # Lookup + embed for each file
-        new_successes = []
-        for meta, path in successes:
-            enriched, w = await self.tag_lookup.lookup(path, hints=meta)
-            warnings.extend([(path.name, m) for _, m in w])
-            try:
-                self.embedder.embed(path, _sanitize_for_embed(enriched), enriched.get("cover_bytes"))
-            except Exception as e:
-                warnings.append((path.name, f"Metadata embed error: {e}"))
-            new_successes.append((enriched, path))
-        successes = new_successes
-
-        summary = build_summary_md(successes, warnings, failures)
-        await send_chunked(msg, summary, parse_mode="Markdown")
+        await self._handle_upload(msg)
 
     # ------------------------------------------------------------------ #
     async def handle_document_message(self, msg: types.Message):
         """
         Handle generic file uploads (Telegram Document). Uses aiogram download flow.
         """
+        await self._handle_upload(msg)
+
+    async def _handle_upload(self, msg: types.Message):
         if not await self._authorized(msg):
             return
 
-        user_root = self._user_root(msg.from_user)
-        file_dl = FileDownloader(
-            user_root,
-            subdir=self.fu_subdir,
-            allowed_exts=self.fu_allowed_exts,
-        )
+        # FileDownloader rooted at this user's folder
+        file_dl = self._downloader("file", self._user_root(msg.from_user))
 
-        await msg.reply("🔄 Received file, checking and saving...")
+        # chat action instead of an ack message (nothing to clean up later)
+        await throttled_chat_action(self.bot, msg.chat.id, ChatAction.UPLOAD_DOCUMENT)
 
         successes, failures, warnings = await file_dl.download_message(self.bot, msg)
-
-        new_successes = []
-        for meta, path in successes:
-            enriched, w = await self.tag_lookup.lookup(path, hints=meta)
-            warnings.extend([(path.name, m) for _, m in w])
-            try:
-                self.embedder.embed(path, _sanitize_for_embed(enriched), enriched.get("cover_bytes"))
-            except Exception as e:
-                warnings.append((path.name, f"Metadata embed error: {e}"))
-            new_successes.append((enriched, path))
-        successes = new_successes
-
-        summary = build_summary_md(successes, warnings, failures)
-        await send_chunked(msg, summary, parse_mode="Markdown")
+        await self._finish(msg, successes, failures, warnings)
 
     # ------------------------------------------------------------------ #
     async def handle_text_message(self, msg: types.Message):
@@ -368,54 +411,45 @@ class MusicBot:
         url = msg.text.strip()
         platform, link_type = self.detector.detect(url)
         if not platform:
-            return await msg.reply(
+            return await throttled_reply(
+                msg,
                 "❓ Please send a valid link to a track, album, or playlist "
                 "(YouTube, Spotify)."
             )
 
-        await msg.reply(f"🔄 Detected {link_type} on {platform}, starting download...")
+        await throttled_chat_action(self.bot, msg.chat.id, ChatAction.UPLOAD_DOCUMENT)
 
         # Per-user base
         user_root = self._user_root(msg.from_user)
 
-        # Create one-off downloaders rooted at user_root
-        yt_cookie_str = str(self.yt_cookie) if self.yt_cookie else None
-        yt_dl = YouTubeDownloader(
-            user_root,
-            cookie_file=yt_cookie_str,
-            enrich_from_ytmusic=False,
-            enrich_from_spotify=False,
-        )
-        sp_dl = SpotifyDownloader(
-            user_root,
-            self.spotify_creds,
-            cookie_file=yt_cookie_str,
-        )
+        # Downloader for the detected platform, rooted at user_root
+        # (only that platform's module gets imported)
         # ym_dl = YandexDownloader(user_root, self.yandex_creds)  # if enabled
 
         try:
-            if platform == "youtube":
-                successes, failures, warnings = await yt_dl.download(url, link_type)
-            elif platform == "spotify":
-                successes, failures, warnings = await sp_dl.download(url, link_type)
+            if platform in ("youtube", "spotify"):
+                dl = self._downloader(platform, user_root)
+                successes, failures, warnings = await dl.download(url, link_type)
             else:
                 successes, failures, warnings = [], [(url, "Yandex downloader not enabled.")], []
-
-            # Enrich + embed
-            new_successes = []
-            for meta, path in successes:
-                enriched, w = await self.tag_lookup.lookup(path, hints=meta)
-                warnings.extend([(path.name, m) for _, m in w])
-                try:
-                    self.embedder.embed(path, _sanitize_for_embed(enriched), enriched.get("cover_bytes"))
-                except Exception as e:
-                    warnings.append((path.name, f"Metadata embed error: {e}"))
-                new_successes.append((enriched, path))
-            successes = new_successes
-
         except Exception as e:
-            return await msg.reply(f"❗ An unexpected error occurred: {e}")
+            return await throttled_reply(msg, f"❗ An unexpected error occurred: {e}")
 
+        await self._finish(msg, successes, failures, warnings)
+
+    # ------------------------------------------------------------------ #
+    async def _finish(
+        self,
+        msg: types.Message,
+        successes: List[Tuple[dict, Path]],
+        failures: List[Tuple[str, str]],
+        warnings: List[Tuple[str, str]],
+    ):
+        """
+        Common tail of every handler: enrich + embed the downloaded files,
+        then reply with the summary.
+        """
+        successes = await self._tag_files(successes, warnings)
         summary = build_summary_md(successes, warnings, failures)
         await send_chunked(msg, summary, parse_mode="Markdown")
 
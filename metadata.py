@@ -1,5 +1,8 @@
 # metadata.py
 
+import hashlib
+import io
+from functools import partial
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -14,6 +17,47 @@ from mutagen.mp3 import MP3, HeaderNotFoundError
 # MP4 / M4A imports
 from mutagen.mp4 import MP4, MP4Cover
 
+# Optional: cover downscaling (covers are embedded as-is without Pillow)
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover
+    Image = None
+
+TAG_PADDING = 4096  # bytes reserved after the tag when it has to grow
+COVER_MAX_PX = 500  # Navidrome & players don't need bigger embedded art
+COVER_CACHE_SIZE = 64  # shrunk covers kept, keyed by digest of the original
+
+
+def _utf8(frame_cls, **fixed):
+    """
+    Frame factory with the per-frame constants (UTF-8 encoding, desc/lang)
+    bound once at import. Frames themselves are built fresh for every file:
+    Mutagen keeps a reference to the object, so they can't be shared.
+    """
+    return partial(frame_cls, encoding=3, **fixed)
+
+
+_TIT2, _TPE1, _TALB = _utf8(TIT2), _utf8(TPE1), _utf8(TALB)
+_USLT = _utf8(USLT, desc="Lyrics")
+_COMM = _utf8(COMM, lang="eng", desc="Comment")
+_WXXX = _utf8(WXXX, desc="Original URL")
+_TXXX = _utf8(TXXX)
+_APIC = _utf8(APIC, mime="image/jpeg", type=3, desc="Cover")
+
+
+def cover_digest(data: bytes) -> bytes:
+    """Identity of a cover image (for dedup / memo keys)."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _padding(info) -> int:
+    """
+    Mutagen padding strategy: if the new tag fits in the existing padding,
+    keep it as is (in-place write); otherwise reserve TAG_PADDING, so later
+    re-tags fit in place instead of shifting the whole audio payload again.
+    """
+    return info.padding if info.padding >= 0 else TAG_PADDING
+
 
 class MetadataEmbedder:
     """
@@ -23,15 +67,78 @@ class MetadataEmbedder:
     - M4A/MP4 (AAC in MP4 container): Writes MP4 atoms using Mutagen MP4 APIs.
     """
 
+    # Plain ID3 text frames: (meta key, frame id, frame factory, value coercion).
+    # Written only when the value is set (non-empty).
+    _ID3_TEXT_FRAMES = (
+        ("album_artist", "TPE2", _utf8(TPE2), None),
+        ("release_date", "TDRC", _utf8(TDRC), str),
+        ("genre",        "TCON", _utf8(TCON), None),
+        ("composer",     "TCOM", _utf8(TCOM), None),
+        ("publisher",    "TPUB", _utf8(TPUB), None),
+        ("isrc",         "TSRC", _utf8(TSRC), None),
+        ("bpm",          "TBPM", _utf8(TBPM), str),
+        ("copyright",    "TCOP", _utf8(TCOP), None),
+        ("encoder",      "TENC", _utf8(TENC), None),
+    )
+    # Numbering frames: 0 is a legal value, so only None is skipped.
+    _ID3_NUMBER_FRAMES = (
+        ("track_number", "TRCK", _utf8(TRCK)),
+        ("disc_number",  "TPOS", _utf8(TPOS)),
+    )
+
+    def __init__(self):
+        self._covers: Dict[bytes, bytes] = {}  # see shrink_cover
+        # extension -> tagger; a new container is one more entry
+        self._handlers = {
+            ".mp3": self._embed_mp3,
+            ".m4a": self._embed_m4a,
+            ".mp4": self._embed_m4a,
+        }
+
     def embed(self, filepath: Path, meta: Dict[str, Any], cover_bytes: Optional[bytes] = None):
         suffix = filepath.suffix.lower()
-        if suffix == ".mp3":
-            self._embed_mp3(filepath, meta, cover_bytes)
-        elif suffix in (".m4a", ".mp4"):
-            self._embed_m4a(filepath, meta, cover_bytes)
-        else:
+        handler = self._handlers.get(suffix)
+        if handler is None:
             # Unknown format: silently ignore or raise? choose warn-style exception so caller can record warning
             raise RuntimeError(f"Unsupported tagging format: {suffix}")
+        if cover_bytes:
+            cover_bytes = self.shrink_cover(cover_bytes)
+        handler(filepath, meta, cover_bytes)
+
+    # ------------------------------------------------------------------ #
+    # Cover art
+    # ------------------------------------------------------------------ #
+    def shrink_cover(self, data: bytes) -> bytes:
+        """
+        Downscale cover art to COVER_MAX_PX and re-encode as JPEG q80, so
+        a 1-2 MB original doesn't get written into every track of an album.
+        Memoized by digest (tracks of an album share the cover), also for the
+        result itself, so shrinking shrunk art is a lookup. JPEGs that are
+        small enough already, non-images, or missing Pillow: unchanged.
+        """
+        if Image is None:
+            return data
+        key = cover_digest(data)
+        shrunk = self._covers.get(key)
+        if shrunk is not None:
+            return shrunk
+        try:
+            with Image.open(io.BytesIO(data)) as im:
+                if im.format == "JPEG" and max(im.size) <= COVER_MAX_PX:
+                    shrunk = data
+                else:
+                    im.thumbnail((COVER_MAX_PX, COVER_MAX_PX))
+                    out = io.BytesIO()
+                    im.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+                    shrunk = out.getvalue()
+        except Exception:
+            shrunk = data  # let the tagger embed what it got
+        if len(self._covers) >= COVER_CACHE_SIZE:
+            self._covers.clear()
+        self._covers[key] = shrunk
+        if shrunk is not data:
+            self._covers[cover_digest(shrunk)] = shrunk
+        return shrunk
 
     # ------------------------------------------------------------------ #
     # MP3 tagging
@@ -53,54 +160,37 @@ class MetadataEmbedder:
             except Exception:
                 pass
 
+        get = meta.get
         try:
-            audio["TIT2"] = TIT2(encoding=3, text=meta.get("title", ""))
-            audio["TPE1"] = TPE1(encoding=3, text=meta.get("artist", ""))
-            audio["TALB"] = TALB(encoding=3, text=meta.get("album", ""))
-
-            if meta.get("album_artist"):
-                audio["TPE2"] = TPE2(encoding=3, text=meta["album_artist"])
-            if meta.get("track_number") is not None:
-                audio["TRCK"] = TRCK(encoding=3, text=str(meta["track_number"]))
-            if meta.get("disc_number") is not None:
-                audio["TPOS"] = TPOS(encoding=3, text=str(meta["disc_number"]))
-            if meta.get("release_date"):
-                audio["TDRC"] = TDRC(encoding=3, text=str(meta["release_date"]))
-            if meta.get("genre"):
-                audio["TCON"] = TCON(encoding=3, text=meta["genre"])
-            if meta.get("composer"):
-                audio["TCOM"] = TCOM(encoding=3, text=meta["composer"])
-            if meta.get("publisher"):
-                audio["TPUB"] = TPUB(encoding=3, text=meta["publisher"])
-            if meta.get("isrc"):
-                audio["TSRC"] = TSRC(encoding=3, text=meta["isrc"])
-            if meta.get("bpm"):
-                audio["TBPM"] = TBPM(encoding=3, text=str(meta["bpm"]))
-            if meta.get("lyrics"):
-                audio["USLT"] = USLT(encoding=3, desc="Lyrics", text=meta["lyrics"])
-            if meta.get("comment"):
-                audio["COMM"] = COMM(encoding=3, lang="eng", desc="Comment", text=meta["comment"])
-            if meta.get("copyright"):
-                audio["TCOP"] = TCOP(encoding=3, text=meta["copyright"])
-            if meta.get("encoder"):
-                audio["TENC"] = TENC(encoding=3, text=meta["encoder"])
-            if meta.get("url"):
-                audio["WXXX"] = WXXX(encoding=3, desc="Original URL", url=meta["url"])
+            audio["TIT2"] = _TIT2(text=get("title", ""))
+            audio["TPE1"] = _TPE1(text=get("artist", ""))
+            audio["TALB"] = _TALB(text=get("album", ""))
+
+            for key, frame_id, make, coerce in self._ID3_TEXT_FRAMES:
+                v = get(key)
+                if v:
+                    audio[frame_id] = make(text=coerce(v) if coerce else v)
+            for key, frame_id, make in self._ID3_NUMBER_FRAMES:
+                v = get(key)
+                if v is not None:
+                    audio[frame_id] = make(text=str(v))
+
+            # frames with extra fields
+            if get("lyrics"):
+                audio["USLT"] = _USLT(text=meta["lyrics"])
+            if get("comment"):
+                audio["COMM"] = _COMM(text=meta["comment"])
+            if get("url"):
+                audio["WXXX"] = _WXXX(url=meta["url"])
             for key in ("popularity", "mood", "scene"):
-                if meta.get(key) is not None:
+                if get(key) is not None:
                     frame_id = f"TXXX:{key.upper()}"
-                    audio[frame_id] = TXXX(encoding=3, desc=key, text=str(meta[key]))
+                    audio[frame_id] = _TXXX(desc=key, text=str(meta[key]))
 
             if cover_bytes:
-                audio["APIC"] = APIC(
-                    encoding=3,
-                    mime="image/jpeg",
-                    type=3,
-                    desc="Cover",
-                    data=cover_bytes,
-                )
-
-            audio.save()
+                audio["APIC"] = _APIC(data=cover_bytes)
+
+            audio.save(v2_version=4, padding=_padding)
         except Exception as e:
             raise RuntimeError(f"Metadata embedding failed: {e}")
 
@@ -163,6 +253,6 @@ class MetadataEmbedder:
 
         mp4.tags = tags
         try:
-            mp4.save()
+            mp4.save(padding=_padding)
         except Exception as e:
             raise RuntimeError(f"M4A metadata embedding failed: {e}")
@@ -14,22 +14,88 @@ Steps:
 from __future__ import annotations
 
 import asyncio
+import functools
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import re
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 
 import aiohttp
 import mutagen  # :contentReference[oaicite:19]{index=19}
 
+from utils import AsyncLeakyBucket
+
 try:
     import acoustid  # pyacoustid wrapper  # :contentReference[oaicite:20]{index=20}
 except ImportError:  # pragma: no cover
     acoustid = None
 
+try:
+    import orjson  # faster parsing of the large MB release documents
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # pragma: no cover
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+# ------------------------------------------------------------------ #
+# Tag value coercion (lookup results go straight to MetadataEmbedder)
+# ------------------------------------------------------------------ #
+_NUM_RE = re.compile(r"^\s*(\d+)")
+_DATE_RE = re.compile(r"^(\d{4})")
+_DROP_IF_NONE = frozenset({"cover_url", "url", "tags", "description", "popularity"})
+
+def _first_int(val: Any) -> Optional[int]:
+    """
+    Coerce common tag representations ('05', '5/12', ['5'], None) to int.
+    """
+    # fast paths: most values are already ints or plain digit strings
+    # (isdecimal == what \d accepts, and int() parses all of it)
+    t = type(val)
+    if t is int:
+        return val
+    if t is str and val.isdecimal():
+        return int(val)
+    if val is None:
+        return None
+    if isinstance(val, int):
+        return val
+    if isinstance(val, (list, tuple)) and val:
+        return _first_int(val[0])
+    if isinstance(val, str):
+        m = _NUM_RE.match(val)
+        if m:
+            try:
+                return int(m.group(1))
+            except ValueError:
+                return None
+    try:
+        return int(val)
+    except Exception:
+        return None
+
+def _year_from_date(val: Any) -> Optional[str]:
+    if not val:
+        return None
+    if isinstance(val, (list, tuple)) and val:
+        return _year_from_date(val[0])
+    s = str(val)
+    if len(s) == 4 and s.isdecimal():
+        return s  # bare year, no regex needed
+    m = _DATE_RE.match(s)
+    return m.group(1) if m else None
+
+
 # ------------------------------------------------------------------ #
 @dataclass
 class LookupConfig:
@@ -42,17 +108,308 @@ class LookupConfig:
     discogs_token: Optional[str] = None
     prefer_existing: bool = True
     fetch_cover_art: bool = True
+    # SQLite file for cached API responses (None: in-memory memo only)
+    cache_path: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_tags_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # mtime_ns/size only take part in the cache key: rewriting the file
+    # changes them and forces a fresh parse. One mutagen pass by path: it
+    # only seeks/reads the headers, and the name lets it guess the format
+    # by extension.
+    return _tags_from(mutagen.File(path, easy=True))
+
+
+def _tags_from(f: Any) -> Dict[str, Any]:
+    if not f:
+        return {}
+    get = lambda key: (f.tags.get(key)[0] if key in f.tags else None)
+    return {
+        "title": get("title"),
+        "artist": get("artist"),
+        "album": get("album"),
+        "album_artist": get("albumartist") or get("album artist"),
+        "track_number": get("tracknumber"),
+        "disc_number": get("discnumber"),
+        "genre": get("genre"),
+        "date": get("date"),
+    }
+
+
+class _ResponseCache:
+    """
+    Persistent cache of external API responses (parsed JSON or raw bytes),
+    keyed by request URL + params, with a TTL per source. MBIDs and release
+    data rarely change, so a re-tag or restart skips MusicBrainz & co.
+
+    Single WAL-mode connection, used only from one dedicated thread, so
+    reads and (up to cover-sized) writes never block the event loop.
+    Expired rows are purged on open and every PURGE_EVERY writes; cover
+    images make up most of the bytes, so the purge also drops the oldest
+    rows once the payloads add up to more than MAX_BYTES.
+    """
+
+    PURGE_EVERY = 500
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at INTEGER NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._purge()
+        self._writes = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lookup-cache")
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        raw = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self._get, key)
+
+    async def put(self, key: str, payload: bytes, ttl: int) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._pool, self._put, key, payload, ttl)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)  # pending writes first
+        self._db.close()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        row = self._db.execute(
+            "SELECT payload FROM responses WHERE key = ? AND expires_at >= ?",
+            (key, int(time.time())),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, payload: bytes, ttl: int) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, expires_at, payload) VALUES (?, ?, ?)",
+            (key, int(time.time()) + ttl, payload),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._purge()
+
+    def _purge(self) -> None:
+        self._db.execute("DELETE FROM responses WHERE expires_at < ?", (int(time.time()),))
+        # INSERT OR REPLACE gives a row a fresh rowid, so rowid order is
+        # write order: keep the newest rows that fit in MAX_BYTES
+        self._db.execute(
+            "DELETE FROM responses WHERE rowid IN ("
+            " SELECT rowid FROM ("
+            "  SELECT rowid, SUM(length(payload)) OVER (ORDER BY rowid DESC) AS total FROM responses"
+            " ) WHERE total > ?)",
+            (self.MAX_BYTES,),
+        )
+
+
+class _AsyncMemo:
+    """
+    Bounded LRU of coroutine results. Concurrent callers asking for the same
+    key await one shared task, so e.g. all tracks of an album pay for a
+    single release / cover request. Failures are not cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        # fetched or in flight
+        return key in self._data
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._data.get(key)
+        if fut is None:
+            fut = self._data[key] = asyncio.ensure_future(fetch())
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self._data.move_to_end(key)
+        try:
+            # shield: one cancelled waiter must not cancel the others' fetch
+            return await asyncio.shield(fut)
+        except Exception:
+            if self._data.get(key) is fut:
+                del self._data[key]
+            raise
 
 
 class TagLookup:
-    def __init__(self, cfg: LookupConfig):
+    # response cache TTLs, seconds
+    TTL_MUSICBRAINZ = 30 * 86400
+    TTL_COVER_ART   = 90 * 86400
+    TTL_SEARCH      = 7 * 86400  # Last.fm / Discogs
+    TTL_FINGERPRINT = 365 * 86400  # keyed by file stat, never goes stale
+    COVER_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, cfg: LookupConfig, *, concurrency: int = 8):
         self.cfg = cfg
         self.log = logging.getLogger("TagLookup")
+        # cap on lookups in flight (shared by all callers of this instance)
+        self._sem = asyncio.Semaphore(concurrency)
+        # album-level results, shared between the tracks of a release
+        self._release_cache = _AsyncMemo(512)
+        self._cover_cache = _AsyncMemo(512)
+        self._discogs_cache = _AsyncMemo(512)
+        # Chromaprint results per (path, mtime_ns, size)
+        self._fp_cache = _AsyncMemo(1024)
+        # decoding + Chromaprint is CPU-bound: own processes, so it neither
+        # holds the GIL nor queues behind the default thread pool. forkserver:
+        # forking the bot itself would copy its running threads' locks (log
+        # listener, embed / download pools) into the workers.
+        self._fp_pool = ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, 8),
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+        # per-service request rates; MB answers bursts above 1/s with 503s
+        self._mb_limiter = AsyncLeakyBucket(rate_per_sec=1)
+        self._caa_limiter = AsyncLeakyBucket(rate_per_sec=5)
+        self._lf_limiter = AsyncLeakyBucket(rate_per_sec=5)
+        self._dc_limiter = AsyncLeakyBucket(rate_per_sec=1)
+        # one keep-alive pool for every lookup request; see _http()
+        self._session: Optional[aiohttp.ClientSession] = None
+        # persistent responses, optional
+        self._responses: Optional[_ResponseCache] = None
+        if cfg.cache_path:
+            try:
+                self._responses = _ResponseCache(Path(cfg.cache_path).expanduser())
+            except sqlite3.Error as e:
+                self.log.warning("lookup cache unavailable: %s", e)
+
+    # ------------------------------------------------------------------ #
+    def _http(self) -> aiohttp.ClientSession:
+        """
+        Shared aiohttp session, created lazily inside the running event loop.
+        Per-service headers (the User-Agents MB/Discogs require) are passed
+        per request.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=50,
+                    limit_per_host=6,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75,
+                ),
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._fp_pool.shutdown(wait=False, cancel_futures=True)
+        if self._responses is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._responses.close)
+
+    async def _get_json(
+        self,
+        url: str,
+        *,
+        ttl: int,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        limiter: Optional[AsyncLeakyBucket] = None,
+    ) -> Any:
+        """
+        GET + parse JSON through the response cache. Anything but a 200
+        raises (ClientResponseError), so error documents are neither cached
+        nor memoized as results.
+        `limiter` is only waited on when the request actually goes out.
+        """
+        key = _ResponseCache.key(url, params) if self._responses else None
+        if key:
+            hit = await self._responses.get(key)
+            if hit is not None:
+                return _json_loads(hit)
+        if limiter:
+            await limiter.acquire()
+        async with self._http().get(url, params=params, headers=headers) as r:
+            if r.status != 200:
+                raise aiohttp.ClientResponseError(
+                    r.request_info, r.history, status=r.status, message=r.reason or "", headers=r.headers
+                )
+            body = await r.read()
+            data = _json_loads(body)
+        if key:
+            # the body as received is already what a hit needs
+            await self._responses.put(key, body, ttl)
+        return data
+
+    async def _get_bytes(
+        self,
+        url: str,
+        *,
+        ttl: int,
+        headers: Optional[Dict[str, str]] = None,
+        limiter: Optional[AsyncLeakyBucket] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """
+        GET raw body through the response cache. None for a 404 (a definite
+        "there is none", fine to memoize) or when the body is larger than
+        `max_bytes` (streamed, so an oversized one is dropped as soon as it
+        shows up rather than after buffering); any other non-200 (429, 5xx)
+        raises, so a transient failure isn't remembered as "no cover".
+        """
+        key = _ResponseCache.key(url) if self._responses else None
+        if key:
+            hit = await self._responses.get(key)
+            if hit is not None:
+                return hit
+        if limiter:
+            await limiter.acquire()
+        async with self._http().get(url, headers=headers) as r:
+            if r.status == 404:
+                return None
+            if r.status != 200:
+                raise aiohttp.ClientResponseError(
+                    r.request_info, r.history, status=r.status, message=r.reason or "", headers=r.headers
+                )
+            if max_bytes and (r.content_length or 0) > max_bytes:
+                return None
+            buf = bytearray()
+            async for chunk in r.content.iter_chunked(64 * 1024):
+                buf += chunk
+                if max_bytes and len(buf) > max_bytes:
+                    return None
+            body = bytes(buf)
+        if key:
+            await self._responses.put(key, body, ttl)
+        return body
+
+    # ------------------------------------------------------------------ #
+    async def lookup_batch(
+        self,
+        items: List[Tuple[Path, Optional[Dict[str, Any]]]],
+    ) -> List[Tuple[Dict[str, Any], List[Tuple[str, str]]]]:
+        """
+        lookup() for many (path, hints) pairs at once, e.g. a whole playlist.
+        Runs concurrently (bounded by the instance semaphore); album-level
+        requests (release, cover art, Discogs) are made once per album.
+        Results keep input order; a lookup that raises degrades to its hints.
+        """
+        async def _one(path: Path, hints: Optional[Dict[str, Any]]):
+            async with self._sem:
+                try:
+                    return await self.lookup(path, hints=hints)
+                except Exception as e:
+                    return self._finalize(dict(hints or {})), [(path.name, f"Tag lookup failed: {e}")]
+
+        return list(await asyncio.gather(*(_one(p, h) for p, h in items)))
 
     # ------------------------------------------------------------------ #
     async def lookup(self, path: Path, hints: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], List[Tuple[str, str]]]:
         """
         Return (meta, warnings). Never raise (unless catastrophic).
+        meta is ready to embed (see _finalize).
         """
         warnings: List[Tuple[str, str]] = []
         hints = hints or {}
@@ -72,7 +429,7 @@ class TagLookup:
 
         # If disabled -> return what we have
         if not self.cfg.enable:
-            return meta, warnings
+            return self._finalize(meta), warnings
 
         # Collect candidate artist/title for lookups
         artist_hint = meta.get("artist") or hints.get("artist")
@@ -87,121 +444,152 @@ class TagLookup:
             except Exception as e:
                 warnings.append((path.name, f"AcoustID lookup failed: {e}"))
 
-        # 4) MusicBrainz metadata
+        # 4-7) MusicBrainz, Last.fm and Discogs don't depend on each other's
+        # answers, so they run concurrently; cover art follows MB (it needs
+        # the release MBID). Results are merged in the original order, as
+        # _merge only fills gaps: MB, then Last.fm, then Discogs.
+        start = asyncio.ensure_future
+        mb_task = lf_task = dc_task = art_task = None
         if recording_mbid or release_mbid or artist_hint or title_hint:
-            try:
-                mb_meta = await self._musicbrainz_metadata(
-                    recording_mbid=recording_mbid,
-                    release_mbid=release_mbid,
-                    artist=artist_hint,
-                    title=title_hint,
-                )
-                self._merge(meta, mb_meta)
-            except Exception as e:
-                warnings.append((path.name, f"MusicBrainz fetch failed: {e}"))
+            mb_task = start(self._musicbrainz_metadata(
+                recording_mbid=recording_mbid,
+                release_mbid=release_mbid,
+                artist=artist_hint,
+                title=title_hint,
+            ))
+        if self.cfg.lastfm_api_key and (artist_hint or title_hint):
+            lf_task = start(self._lastfm_enrich(artist_hint, title_hint, recording_mbid))
+        if self.cfg.discogs_user_agent and meta.get("album"):
+            # album already known, the merges below can't change it
+            dc_task = start(self._discogs_cached(artist_hint, meta.get("album")))
+
+        try:
+            # 4) MusicBrainz metadata
+            mb_meta: Dict[str, Any] = {}
+            if mb_task:
+                try:
+                    mb_meta = await mb_task
+                    self._merge(meta, mb_meta)
+                except Exception as e:
+                    warnings.append((path.name, f"MusicBrainz fetch failed: {e}"))
+
+            # 5) Cover art (the only source of cover_bytes, so awaited last)
+            if self.cfg.fetch_cover_art and not meta.get("cover_bytes"):
+                mbid_for_art = release_mbid or mb_meta.get("release_mbid")
+                if mbid_for_art:
+                    art_task = start(self._cover_cache.get_or_fetch(
+                        mbid_for_art, lambda: self._cover_art_fetch(mbid_for_art)
+                    ))
+
+            # 6) Last.fm enrichment (genres, corrected names)
+            if lf_task:
+                try:
+                    self._merge(meta, await lf_task)
+                except Exception as e:
+                    warnings.append((path.name, f"Last.fm enrich failed: {e}"))
+
+            # 7) Discogs enrichment (label/year/genres); the album may only be
+            # known now, from MB / Last.fm
+            if dc_task is None and self.cfg.discogs_user_agent and (artist_hint or meta.get("album")):
+                dc_task = start(self._discogs_cached(artist_hint, meta.get("album")))
+            if dc_task:
+                try:
+                    self._merge(meta, await dc_task)
+                except Exception as e:
+                    warnings.append((path.name, f"Discogs enrich failed: {e}"))
 
-        # 5) Cover art
-        if self.cfg.fetch_cover_art and not meta.get("cover_bytes"):
-            mbid_for_art = release_mbid or (mb_meta.get("release_mbid") if 'mb_meta' in locals() else None)
-            if mbid_for_art:
+            if art_task:
                 try:
-                    art_bytes = await self._cover_art_fetch(mbid_for_art)
+                    art_bytes = await art_task
                     if art_bytes:
                         meta["cover_bytes"] = art_bytes
                 except Exception as e:
                     warnings.append((path.name, f"Cover art fetch failed: {e}"))
+        finally:
+            # cancelled mid-way: don't leave requests running for nobody
+            for task in (mb_task, lf_task, dc_task, art_task):
+                if task and not task.done():
+                    task.cancel()
 
-        # 6) Last.fm enrichment (genres, corrected names)
-        if self.cfg.lastfm_api_key and (artist_hint or title_hint):
-            try:
-                lf_meta = await self._lastfm_enrich(artist_hint, title_hint, recording_mbid)
-                self._merge(meta, lf_meta)
-            except Exception as e:
-                warnings.append((path.name, f"Last.fm enrich failed: {e}"))
-
-        # 7) Discogs enrichment (label/year/genres)
-        if self.cfg.discogs_user_agent and (artist_hint or meta.get("album")):
-            try:
-                dc_meta = await self._discogs_enrich(
-                    artist=artist_hint,
-                    album=meta.get("album"),
-                )
-                self._merge(meta, dc_meta)
-            except Exception as e:
-                warnings.append((path.name, f"Discogs enrich failed: {e}"))
-
-        return meta, warnings
+        return self._finalize(meta), warnings
 
     # ------------------------------------------------------------------ #
     def _read_existing_tags(self, path: Path) -> Dict[str, Any]:
         """
         Using mutagen to read tags from many audio formats.  # :contentReference[oaicite:21]{index=21}
+        Memoized per (path, mtime, size), so unchanged files aren't re-parsed.
         """
-        f = mutagen.File(path, easy=True)
-        if not f:
-            return {}
-        get = lambda key: (f.tags.get(key)[0] if key in f.tags else None)
-        return {
-            "title": get("title"),
-            "artist": get("artist"),
-            "album": get("album"),
-            "album_artist": get("albumartist") or get("album artist"),
-            "track_number": get("tracknumber"),
-            "disc_number": get("discnumber"),
-            "genre": get("genre"),
-            "date": get("date"),
-        }
+        st = os.stat(path)
+        return dict(_read_tags_cached(str(path), st.st_mtime_ns, st.st_size))
 
     # ------------------------------------------------------------------ #
     async def _fp_lookup(self, path: Path, artist: Optional[str], title: Optional[str], warnings: List[Tuple[str,str]]):
         """
         Chromaprint/AcoustID fingerprint -> candidate MBIDs.  # :contentReference[oaicite:22]{index=22}
         """
-        loop = asyncio.get_running_loop()
-
-        def _blocking():
-            # returns (duration, fingerprint)
-            import acoustid  # local import safety
-            return acoustid.fingerprint_file(str(path))
-
-        duration, fp = await loop.run_in_executor(None, _blocking)
-
-        def _lookup():
-            import acoustid
-            return acoustid.lookup(self.cfg.acoustid_api_key, fp, duration)
-
-        resp = await loop.run_in_executor(None, _lookup)
-        # resp: (score, recording_ids, etc.)
-        # See pyacoustid readme; we parse top result
-        best_rec = None
-        best_score = 0.0
-        for score, rid, title_cand, artist_cand in resp["results"]:
-            if score > best_score:
-                best_score = score
-                best_rec = rid
-                if not artist:
-                    artist = artist_cand
-                if not title:
-                    title = title_cand
+        duration, fp = await self._fingerprint(path)
+        # network I/O: default thread pool. meta: the default ("recordings")
+        # carries no release IDs, and release IDs are what MB and the Cover
+        # Art Archive are keyed by.
+        resp = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                acoustid.lookup, self.cfg.acoustid_api_key, fp, duration, meta=["recordings", "releases"]
+            ),
+        )
+        # resp: {"results": [{"id", "score", "recordings": [...]}, ...]}
+        # One pass for the top-scoring result; MBIDs come from it alone.
+        best = max(resp.get("results") or [], key=lambda r: r.get("score") or 0.0, default=None)
+        best_score = (best.get("score") or 0.0) if best else 0.0
         if best_score < self.cfg.min_confidence:
             warnings.append((path.name, f"Low AcoustID score {best_score:.2f}"))
             return None, None
 
-        # pyacoustid can also return 'recordings' objects w/ MBIDs
         recording_mbid = None
         release_mbid = None
-        for res in resp["results"]:
-            # pattern differs across API versions; defensive
-            recs = res.get("recordings") or []
-            if recs:
-                recording_mbid = recs[0].get("id")
-                rels = recs[0].get("releasegroups") or []
-                if rels:
-                    release_mbid = rels[0].get("id")
-                break
+        recs = best.get("recordings") or []
+        if recs:
+            recording_mbid = recs[0].get("id")
+            rel_ids = [r["id"] for r in recs[0].get("releases") or () if r.get("id")]
+            if rel_ids:
+                # a recording appears on many releases (single, album,
+                # compilations); prefer one another track already fetched,
+                # so an album's tracks converge on one bulk release request
+                release_mbid = next((r for r in rel_ids if r in self._release_cache), rel_ids[0])
 
         return recording_mbid, release_mbid
 
+    async def _fingerprint(self, path: Path) -> Tuple[float, bytes]:
+        """
+        (duration, fingerprint) of the file; a pure function of its content,
+        so cached per (path, mtime, size) in memory and in the response
+        cache. Only the AcoustID answer for it is re-requested.
+        """
+        st = os.stat(path)
+        stat_key = (str(path), st.st_mtime_ns, st.st_size)
+        return await self._fp_cache.get_or_fetch(stat_key, lambda: self._fingerprint_fetch(stat_key))
+
+    async def _fingerprint_fetch(self, stat_key: Tuple[str, int, int]) -> Tuple[float, bytes]:
+        path, mtime_ns, size = stat_key
+        key = (
+            _ResponseCache.key("fpcalc:" + path, {"mtime_ns": mtime_ns, "size": size})
+            if self._responses else None
+        )
+        if key:
+            hit = await self._responses.get(key)
+            if hit is not None:
+                duration, fp = _json_loads(hit)
+                return duration, fp.encode("ascii")
+
+        # returns (duration, fingerprint); the AcoustID request itself stays
+        # on the default (I/O) thread pool
+        duration, fp = await asyncio.get_running_loop().run_in_executor(
+            self._fp_pool, acoustid.fingerprint_file, path
+        )
+        if key:
+            await self._responses.put(key, _json_dumps([duration, fp.decode("ascii")]), self.TTL_FINGERPRINT)
+        return duration, fp
+
     # ------------------------------------------------------------------ #
     async def _musicbrainz_metadata(
         self,
@@ -214,46 +602,93 @@ class TagLookup:
         """
         Query MusicBrainz Web API for recording / release info.  # :contentReference[oaicite:23]{index=23}
         """
-        headers = {"User-Agent": self.cfg.musicbrainz_useragent, "Accept": "application/json"}
+        headers = self._mb_headers()
         base = "https://musicbrainz.org/ws/2"
-        async with aiohttp.ClientSession(headers=headers) as sess:
-            # Prefer direct MBID lookup
-            if recording_mbid:
-                url = f"{base}/recording/{recording_mbid}?inc=artists+releases&fmt=json"
-                async with sess.get(url) as r:
-                    data = await r.json()
-                    return self._meta_from_mb_recording(data)
-            if release_mbid:
-                url = f"{base}/release/{release_mbid}?inc=artists+recordings&fmt=json"
-                async with sess.get(url) as r:
-                    data = await r.json()
-                    return self._meta_from_mb_release(data)
-            # Fallback search
-            q_parts = []
-            if artist:
-                q_parts.append(f'artist:"{artist}"')
-            if title:
-                q_parts.append(f'track:"{title}"')
-            query = " AND ".join(q_parts) or title or artist
-            url = f"{base}/recording/?query={aiohttp.helpers.quote(query)}&limit=1&fmt=json"
-            async with sess.get(url) as r:
-                data = await r.json()
-            recs = data.get("recordings") or []
-            if not recs:
-                return {}
-            return self._meta_from_mb_recording(recs[0])
+        # Release known: one (memoized) request covers every track on it
+        if release_mbid:
+            try:
+                release_meta, tracks = await self._release_cache.get_or_fetch(
+                    release_mbid, lambda: self._musicbrainz_release_bulk(release_mbid)
+                )
+            except Exception:
+                if not recording_mbid:
+                    raise
+                tracks = {}  # the recording lookup below still works
+            if not recording_mbid:
+                return release_meta
+            if recording_mbid in tracks:
+                return tracks[recording_mbid]
+        # Prefer direct MBID lookup
+        if recording_mbid:
+            url = f"{base}/recording/{recording_mbid}?inc=artists+releases&fmt=json"
+            data = await self._get_json(url, ttl=self.TTL_MUSICBRAINZ, headers=headers, limiter=self._mb_limiter)
+            return self._meta_from_mb_recording(data)
+        # Fallback search
+        q_parts = []
+        if artist:
+            q_parts.append(f'artist:"{artist}"')
+        if title:
+            q_parts.append(f'track:"{title}"')
+        query = " AND ".join(q_parts) or title or artist
+        data = await self._get_json(
+            f"{base}/recording/",
+            ttl=self.TTL_MUSICBRAINZ,
+            params={"query": query, "limit": 1, "fmt": "json"},
+            headers=headers,
+            limiter=self._mb_limiter,
+        )
+        recs = data.get("recordings") or ()
+        if not recs:
+            return {}
+        return self._meta_from_mb_recording(recs[0])
+
+    def _mb_headers(self) -> Dict[str, str]:
+        return {"User-Agent": self.cfg.musicbrainz_useragent, "Accept": "application/json"}
+
+    async def _musicbrainz_release_bulk(
+        self, release_mbid: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Whole release in one request: (album-level meta, {recording_mbid: track meta}).
+        """
+        url = (
+            f"https://musicbrainz.org/ws/2/release/{release_mbid}"
+            "?inc=artists+recordings+artist-credits&fmt=json"
+        )
+        data = await self._get_json(
+            url, ttl=self.TTL_MUSICBRAINZ, headers=self._mb_headers(), limiter=self._mb_limiter
+        )
+        release_meta = self._meta_from_mb_release(data)
+        tracks: Dict[str, Dict[str, Any]] = {}
+        for medium in data.get("media") or ():
+            for tr in medium.get("tracks") or ():
+                rec = tr.get("recording") or {}
+                if not rec.get("id"):
+                    continue
+                tracks[rec["id"]] = {
+                    **release_meta,
+                    "title": tr.get("title") or rec.get("title"),
+                    "artist": self._mb_credit_names(tr.get("artist-credit") or rec.get("artist-credit"))
+                    or release_meta["album_artist"],
+                    "track_number": tr.get("position"),
+                    "disc_number": medium.get("position"),
+                }
+        return release_meta, tracks
+
+    @staticmethod
+    def _mb_credit_names(credits: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        # WS/2 JSON credits are always {"name", "joinphrase", "artist"} dicts
+        if not credits:
+            return None
+        if len(credits) == 1:
+            # the common case: a single credited artist
+            return credits[0].get("name") or None
+        return ", ".join(c["name"] for c in credits if c.get("name")) or None
 
     def _meta_from_mb_recording(self, data: Dict[str, Any]) -> Dict[str, Any]:
         # Very defensive parse; MB schema is rich.  # :contentReference[oaicite:24]{index=24}
         title = data.get("title")
-        # first artist credit
-        credits = data.get("artist-credit") or []
-        artist_names = []
-        for c in credits:
-            if isinstance(c, dict) and "name" in c:
-                artist_names.append(c["name"])
-            elif isinstance(c, str):
-                artist_names.append(c)
+        artist = self._mb_credit_names(data.get("artist-credit"))
         album = None
         track_number = None
         release_mbid = None
@@ -266,7 +701,7 @@ class TagLookup:
                 track_number = rel.get("track-count")
         return {
             "title": title,
-            "artist": ", ".join(artist_names) or None,
+            "artist": artist,
             "album": album,
             "track_number": track_number,
             "release_mbid": release_mbid,
@@ -275,19 +710,12 @@ class TagLookup:
     def _meta_from_mb_release(self, data: Dict[str, Any]) -> Dict[str, Any]:
         album = data.get("title")
         release_mbid = data.get("id")
-        # artists
-        credits = data.get("artist-credit") or []
-        artist_names = []
-        for c in credits:
-            if isinstance(c, dict) and "name" in c:
-                artist_names.append(c["name"])
-            elif isinstance(c, str):
-                artist_names.append(c)
+        album_artist = self._mb_credit_names(data.get("artist-credit"))
         date = data.get("date")
         # track parsing omitted for brevity
         return {
             "album": album,
-            "album_artist": ", ".join(artist_names) or None,
+            "album_artist": album_artist,
             "release_date": date,
             "release_mbid": release_mbid,
         }
@@ -298,11 +726,13 @@ class TagLookup:
         Fetch "front" image bytes from Cover Art Archive.  # :contentReference[oaicite:25]{index=25}
         """
         url = f"https://coverartarchive.org/release/{release_mbid}/front-500"  # 500px thumb
-        async with aiohttp.ClientSession() as sess:
-            async with sess.get(url) as r:
-                if r.status == 200:
-                    return await r.read()
-        return None
+        return await self._get_bytes(
+            url,
+            ttl=self.TTL_COVER_ART,
+            headers={"Accept": "image/jpeg,image/png"},
+            limiter=self._caa_limiter,
+            max_bytes=self.COVER_MAX_BYTES,
+        )
 
     # ------------------------------------------------------------------ #
     async def _lastfm_enrich(self, artist: Optional[str], title: Optional[str], mbid: Optional[str]) -> Dict[str, Any]:
@@ -324,9 +754,10 @@ class TagLookup:
             if title:
                 params["track"] = title
             params["autocorrect"] = "1"
-        async with aiohttp.ClientSession() as sess:
-            async with sess.get("https://ws.audioscrobbler.com/2.0/", params=params) as r:
-                data = await r.json()
+        data = await self._get_json(
+            "https://ws.audioscrobbler.com/2.0/", ttl=self.TTL_SEARCH, params=params,
+            limiter=self._lf_limiter,
+        )
         tr = data.get("track") or {}
         upd = {}
         if "name" in tr:
@@ -346,6 +777,12 @@ class TagLookup:
             upd["genre"] = ", ".join(t["name"] for t in tags if "name" in t)
         return upd
 
+    # ------------------------------------------------------------------ #
+    def _discogs_cached(self, artist: Optional[str], album: Optional[str]) -> Awaitable[Dict[str, Any]]:
+        return self._discogs_cache.get_or_fetch(
+            (artist, album), lambda: self._discogs_enrich(artist=artist, album=album)
+        )
+
     # ------------------------------------------------------------------ #
     async def _discogs_enrich(self, artist: Optional[str], album: Optional[str]) -> Dict[str, Any]:
         """
@@ -361,9 +798,10 @@ class TagLookup:
             params["release_title"] = album
         if self.cfg.discogs_token:
             params["token"] = self.cfg.discogs_token
-        async with aiohttp.ClientSession(headers=headers) as sess:
-            async with sess.get("https://api.discogs.com/database/search", params=params) as r:
-                data = await r.json()
+        data = await self._get_json(
+            "https://api.discogs.com/database/search", ttl=self.TTL_SEARCH, params=params, headers=headers,
+            limiter=self._dc_limiter,
+        )
         results = data.get("results") or []
         if not results:
             return {}
@@ -377,14 +815,52 @@ class TagLookup:
             "cover_url": cover_url,
         }
 
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _finalize(meta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Coerce values (in place) to simple types so Mutagen won't reject them
+        (e.g., MultiSpec errors when giving complex lists/None); the result
+        can be handed to MetadataEmbedder as is.
+        """
+        # ensure required keys exist
+        if not meta.get("artist") and meta.get("album_artist"):
+            meta["artist"] = meta["album_artist"]
+        if not meta.get("album_artist") and meta.get("artist"):
+            meta["album_artist"] = meta["artist"]
+
+        # track / disc numbers -> ints
+        tn = _first_int(meta.get("track_number"))
+        if tn is not None:
+            meta["track_number"] = tn
+        else:
+            meta.pop("track_number", None)
+
+        dn = _first_int(meta.get("disc_number"))
+        if dn is not None:
+            meta["disc_number"] = dn
+        else:
+            meta.pop("disc_number", None)
+
+        # date/year normalization
+        yr = _year_from_date(meta.get("release_date") or meta.get("date"))
+        if yr:
+            meta["date"] = yr
+
+        # drop unembeddable large objects (like cover_url) – embedder gets cover_bytes separately
+        for drop_key in _DROP_IF_NONE:
+            if meta.get(drop_key, False) is None:  # one lookup: present *and* None
+                del meta[drop_key]
+
+        return meta
+
     # ------------------------------------------------------------------ #
     @staticmethod
     def _merge(dst: Dict[str, Any], src: Dict[str, Any]):
         """
         Merge in src where dst lacks value.
         """
+        get = dst.get  # runs up to 4x per file; skip the attribute lookups
         for k, v in src.items():
-            if v is None:
-                continue
-            if not dst.get(k):
+            if v is not None and not get(k):
                 dst[k] = v
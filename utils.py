@@ -1,22 +1,117 @@
 # utils.py
 
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# Background writer of the current setup_logging() call (None until called)
+_listener: logging.handlers.QueueListener = None
+
 
 def setup_logging(logfile: Path = None):
     """
     Configures root logger. If logfile is given, logs to that file;
     otherwise logs to stdout.
+
+    Records are only enqueued on the calling thread; a QueueListener thread
+    formats and writes them, so coroutines never block on disk/console I/O.
+    Calling again replaces the previous configuration (unlike basicConfig,
+    which silently ignores a second call).
     """
+    global _listener
     fmt = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     if logfile:
-        logging.basicConfig(
-            filename=str(logfile),
-            level=logging.INFO,
-            format=fmt
-        )
+        handler = logging.FileHandler(str(logfile))
     else:
-        logging.basicConfig(
-            level=logging.INFO,
-            format=fmt
-        )
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(fmt))
+
+    if _listener is not None:
+        _listener.stop()  # flushes what's still queued
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+        old.close()
+
+    q = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(q))
+    root.setLevel(logging.INFO)
+    _listener = logging.handlers.QueueListener(q, handler, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def _stop_logging():
+    if _listener is not None:
+        _listener.stop()
+
+
+class AsyncLeakyBucket:
+    """
+    Leaky bucket for coroutines: acquire() lets at most `rate` callers per
+    second through (single event loop, so no lock needed). One instance per
+    limit, shared by everything it should cap (e.g. all Telegram replies,
+    all MusicBrainz requests).
+    """
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        wait = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Tiny thread-safe LRU with an optional time-to-live per entry
+    (ttl=None: entries never expire). Used for the downloaders' module-level
+    API response / enrichment caches, which are shared by every user's
+    downloader and hit from worker threads.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return default
+            if hit[0] < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fetch()  # outside the lock: network call
+            self.put(key, value)
+        return value